@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Concurrent, cached agent availability probing.
+
+Running ``<agent> --version`` for every agent in turn stalls startup on
+missing or slow CLIs.  Probes here run in parallel threads, and each
+finished probe is cached on disk together with the binary's resolved path,
+size and mtime.  The cached answer is reused until the binary changes, so
+repeated invocations do not start any process at all.
+
+Only successful probes are cached.  Missing binaries are detected with a
+PATH lookup, and failures and timeouts are probed again on every run,
+since they are often caused by the environment (a missing runtime, config
+or API key) rather than the binary, and fixing that does not change it.
+
+The cache lives in ``agent_probes.json`` under ``palette_lut.CACHE_DIR``.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import palette_lut
+
+CACHE_NAME = "agent_probes.json"
+
+# Probe outcomes
+OK = "ok"                    # ran and exited with status 0
+FAILED = "failed"            # ran but exited with an error
+TIMEOUT = "timeout"
+MISSING = "missing"          # not found on PATH
+EXEC_FAILED = "exec_failed"  # on PATH but could not be started (EACCES, ENOEXEC, bad interpreter)
+
+
+def cache_path(cache_dir=None):
+    return os.path.join(cache_dir or palette_lut.CACHE_DIR, CACHE_NAME)
+
+
+def load_cache(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path, cache):
+    """Write the cache atomically."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def binary_fingerprint(executable):
+    """``{"path", "size", "mtime"}`` of a resolved executable, or None if it is not on PATH."""
+    path = shutil.which(executable)
+    if path is None:
+        return None
+    path = os.path.realpath(path)
+    st = os.stat(path)
+    return {"path": path, "size": st.st_size, "mtime": st.st_mtime_ns}
+
+
+def probe(command, timeout=10, fingerprint=None):
+    """Run ``command`` (e.g. ``["aide", "--version"]``) and describe the outcome.
+
+    Returns ``{"status", "version", "path", "size", "mtime"}``; ``version``
+    is the first line of output.
+    """
+    fingerprint = fingerprint or binary_fingerprint(command[0])
+    if fingerprint is None:
+        return {"status": MISSING, "version": None, "path": None, "size": None, "mtime": None}
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return dict(fingerprint, status=TIMEOUT, version=None)
+    except OSError:
+        return dict(fingerprint, status=EXEC_FAILED, version=None)
+    output = (result.stdout or result.stderr).strip()
+    return dict(fingerprint, status=OK if result.returncode == 0 else FAILED,
+                version=output.splitlines()[0] if output else None)
+
+
+def probe_all(commands, timeout=10, cache_dir=None, use_cache=True):
+    """Probe ``{name: command}`` concurrently; returns ``{name: probe result}`` in input order.
+
+    Each result also has ``"cached"``: True when it came from the cache.
+    """
+    path = cache_path(cache_dir)
+    cache = load_cache(path) if use_cache else {}
+    results = {}
+    pending = {}
+    for name, command in commands.items():
+        fingerprint = binary_fingerprint(command[0])
+        key = " ".join(command)
+        entry = cache.get(key)
+        if fingerprint is None:
+            results[name] = dict(probe(command, timeout, fingerprint), cached=False)
+        elif entry is not None and all(entry.get(k) == v for k, v in fingerprint.items()):
+            results[name] = dict(entry, cached=True)
+        else:
+            pending[name] = (key, command, fingerprint)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {name: executor.submit(probe, command, timeout, fingerprint)
+                       for name, (_, command, fingerprint) in pending.items()}
+            for name, future in futures.items():
+                result = future.result()
+                results[name] = dict(result, cached=False)
+                if result["status"] == OK:
+                    cache[pending[name][0]] = result
+        save_cache(path, cache)
+
+    return {name: results[name] for name in commands}
@@ -0,0 +1,191 @@
+"""
+Per-image color area index written next to a generated dataset.
+
+The generator counts every color's pixels to pick the dominant one; this
+keeps those counts in ``color_areas.npz`` so evaluators, reports and
+hard-case analysis can read them without decoding any image.  Arrays:
+
+- ``filenames``: image filenames, in dataset order
+- ``colors``: names of the count columns
+- ``counts``: uint32 pixel counts, shape ``(N, len(colors))``
+- ``dominant`` / ``runner_up``: column index of the largest and second
+  largest color, -1 when there is none
+- ``margin``: dominant count minus runner-up count
+
+Ranks follow the generator's tie-breaking: among equal counts, the color
+seen first in row-major order ranks higher.
+"""
+
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+AREA_INDEX_NAME = "color_areas.npz"
+
+
+def area_summary(color_areas):
+    """``(counts, dominant, runner_up, margin)`` for an ordered ``{color: count}`` dict.
+
+    ``dominant`` and ``runner_up`` are color names or None.
+    """
+    # sorted() is stable with reverse=True, so ties keep first-occurrence order
+    ranked = sorted(color_areas, key=color_areas.get, reverse=True)
+    dominant = ranked[0] if ranked else None
+    runner_up = ranked[1] if len(ranked) > 1 else None
+    margin = color_areas[dominant] - color_areas.get(runner_up, 0) if dominant else 0
+    return dict(color_areas), dominant, runner_up, margin
+
+
+class _AreaArrays:
+    """Preallocated index arrays for ``num_rows`` images, filled one row at a time.
+
+    With ``spool_dir`` the arrays are ``.npy`` memmaps in that directory
+    rather than in RAM, and ``save`` copies those files into the archive
+    as they are.
+    """
+
+    def __init__(self, colors, num_rows, filename_width, spool_dir=None):
+        self.colors = list(colors)
+        self.column = {name: i for i, name in enumerate(self.colors)}
+        self.spool_dir = spool_dir
+        self.filenames = self._allocate("filenames", (num_rows,), "<U{}".format(max(1, filename_width)))
+        self.counts = self._allocate("counts", (num_rows, len(self.colors)), np.uint32)
+        self.dominant = self._allocate("dominant", (num_rows,), np.int8, fill=-1)
+        self.runner_up = self._allocate("runner_up", (num_rows,), np.int8, fill=-1)
+        self.margin = self._allocate("margin", (num_rows,), np.int64)
+
+    def _allocate(self, name, shape, dtype, fill=None):
+        if self.spool_dir is None:
+            array = np.zeros(shape, dtype=dtype)
+        else:
+            # New memmap files read as zeros
+            array = np.lib.format.open_memmap(os.path.join(self.spool_dir, name + ".npy"), mode="w+",
+                                              dtype=dtype, shape=shape)
+        if fill is not None:
+            array[...] = fill
+        return array
+
+    def set_row(self, row, filename, summary):
+        color_counts, top, second, gap = summary
+        self.filenames[row] = filename
+        for name, count in color_counts.items():
+            self.counts[row, self.column[name]] = count
+        if top is not None:
+            self.dominant[row] = self.column[top]
+        if second is not None:
+            self.runner_up[row] = self.column[second]
+        self.margin[row] = gap
+
+    def save(self, path):
+        """Write the arrays to ``path`` (an .npz file), atomically."""
+        tmp_path = path + ".tmp.npz"
+        arrays = {"filenames": self.filenames, "colors": np.array(self.colors, dtype=str), "counts": self.counts,
+                  "dominant": self.dominant, "runner_up": self.runner_up, "margin": self.margin}
+        if self.spool_dir is None:
+            np.savez(tmp_path, **arrays)
+        else:
+            # Same layout as np.savez (stored .npy members), without reading the arrays back in
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for name, array in arrays.items():
+                    npy_path = os.path.join(self.spool_dir, name + ".npy")
+                    if isinstance(array, np.memmap):
+                        array.flush()
+                    else:
+                        np.save(npy_path, array)
+                    archive.write(npy_path, name + ".npy")
+        os.replace(tmp_path, path)
+
+
+def write_area_index(path, colors, summaries):
+    """Write ``{filename: area_summary(...)}`` to ``path`` (an .npz file), atomically."""
+    arrays = _AreaArrays(colors, len(summaries), max(map(len, summaries), default=1))
+    for row, (filename, summary) in enumerate(summaries.items()):
+        arrays.set_row(row, filename, summary)
+    arrays.save(path)
+
+
+def append_summary(f, row, filename, summary):
+    """Append one summary for index row ``row`` as a JSON line; see ``compact_jsonl``."""
+    color_counts, dominant, runner_up, margin = summary
+    f.write(json.dumps({"row": row, "filename": filename, "counts": color_counts, "dominant": dominant,
+                        "runner_up": runner_up, "margin": margin}) + "\n")
+
+
+def _iter_jsonl(jsonl_path):
+    with open(jsonl_path, "r") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def compact_jsonl(jsonl_path, path, colors, num_rows):
+    """Convert summaries appended with ``append_summary`` into an index at ``path``.
+
+    Lines may be in any order; each lands in its own ``row``.  The JSONL is
+    read twice, once to size the filename column and once to fill the
+    rows, and the arrays are spooled to disk next to ``path``, so memory
+    use does not grow with ``num_rows``.
+    """
+    filename_width = max((len(record["filename"]) for record in _iter_jsonl(jsonl_path)), default=1)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(path) or ".", prefix=".area_index.") as spool_dir:
+        arrays = _AreaArrays(colors, num_rows, filename_width, spool_dir)
+        for record in _iter_jsonl(jsonl_path):
+            arrays.set_row(record["row"], record["filename"], (record["counts"], record["dominant"],
+                                                              record["runner_up"], record["margin"]))
+        arrays.save(path)
+
+
+class AreaIndex:
+    """Read-only view of a ``color_areas.npz`` index."""
+
+    def __init__(self, path):
+        if os.path.isdir(path):
+            path = os.path.join(path, AREA_INDEX_NAME)
+        with np.load(path) as data:
+            self.filenames = data["filenames"].tolist()
+            self.colors = data["colors"].tolist()
+            self.counts = data["counts"]
+            self.dominant = data["dominant"]
+            self.runner_up = data["runner_up"]
+            self.margin = data["margin"]
+        self.rows = {filename: row for row, filename in enumerate(self.filenames)}
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __iter__(self):
+        return iter(self.filenames)
+
+    def __contains__(self, filename):
+        return filename in self.rows
+
+    def _color(self, column):
+        return self.colors[column] if column >= 0 else None
+
+    def __getitem__(self, filename):
+        """``{"counts", "dominant", "runner_up", "margin"}`` for one image."""
+        row = self.rows[filename]
+        return {
+            "counts": {name: int(n) for name, n in zip(self.colors, self.counts[row]) if n},
+            "dominant": self._color(self.dominant[row]),
+            "runner_up": self._color(self.runner_up[row]),
+            "margin": int(self.margin[row]),
+        }
+
+    def labels(self):
+        return {filename: self._color(self.dominant[row]) for filename, row in self.rows.items()}
+
+    def hard_cases(self, max_margin=None, limit=None):
+        """Filenames ordered by dominance margin, smallest first.
+
+        ``max_margin`` keeps only images whose margin is at most that many
+        pixels; ``limit`` caps the number returned.
+        """
+        order = np.argsort(self.margin, kind="stable")
+        if max_margin is not None:
+            order = order[self.margin[order] <= max_margin]
+        if limit is not None:
+            order = order[:limit]
+        return [self.filenames[row] for row in order]
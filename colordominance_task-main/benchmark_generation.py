@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for dataset generation with per-stage timings.
+
+Sweeps image size, image count, region counts and worker counts through
+the real ``generate_inputs.generate_dataset`` path (process pool,
+manifest, area index and all).  Every configuration runs in a fresh
+subprocess so peak RSS is measured per configuration, and reports:
+
+- images/sec over the whole run
+- seconds spent per stage: draw, count, encode, hash and write summed
+  over worker processes, plus manifest, area_index and json
+- peak RSS of the run and of its worker processes
+
+Results are printed as a table and can be saved as JSON.  ``--compare``
+checks them against a saved baseline and exits with status 1 when a
+configuration got slower than ``--tolerance``.
+
+Usage:
+    python benchmark_generation.py --image_sizes 256 512 --n 50 --workers 1 4 --out bench.json
+    python benchmark_generation.py --compare bench.json
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_inputs import generate_dataset
+
+# Per-image stages (summed over workers), then the ones in the main process
+STAGES = ("draw", "count", "encode", "hash", "write", "manifest", "area_index", "json")
+
+
+def run_config(image_size, num_images, min_regions, max_regions, workers, png_mode="rgb", seed=0):
+    """Benchmark one configuration of ``generate_dataset`` in the current process."""
+    timings = dict.fromkeys(STAGES, 0.0)
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        # generate_dataset lists every image; keep stdout for the JSON result
+        with redirect_stdout(StringIO()):
+            generate_dataset(out_dir, num_images, image_size, min_regions, max_regions, seed=seed,
+                             workers=workers, png_mode=png_mode, timings=timings)
+        wall_time = time.perf_counter() - start
+
+    return {
+        "image_size": image_size,
+        "num_images": num_images,
+        "min_regions": min_regions,
+        "max_regions": max_regions,
+        "workers": workers,
+        "png_mode": png_mode,
+        "wall_time": wall_time,
+        "images_per_sec": num_images / wall_time if wall_time > 0 else 0.0,
+        "stages": timings,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_worker_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def run_config_isolated(config):
+    """Run ``run_config(**config)`` in a fresh interpreter and return its result."""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-config", json.dumps(config)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def config_key(result):
+    return (result["image_size"], result["num_images"], result["min_regions"],
+            result["max_regions"], result["workers"], result["png_mode"])
+
+
+def compare_results(results, baseline, tolerance):
+    """List regressions of ``results`` against ``baseline`` as readable strings.
+
+    A configuration regresses when its throughput drops, or a stage takes
+    longer, by more than ``tolerance`` (a fraction).
+    """
+    baseline_by_key = {config_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        base = baseline_by_key.get(config_key(result))
+        if base is None:
+            continue
+        label = "size={} n={} regions={}-{} workers={} {}".format(*config_key(result))
+        if result["images_per_sec"] < base["images_per_sec"] * (1 - tolerance):
+            regressions.append("{}: {:.1f} images/s vs baseline {:.1f}".format(
+                label, result["images_per_sec"], base["images_per_sec"]))
+        for stage in STAGES:
+            now, before = result["stages"].get(stage, 0.0), base["stages"].get(stage, 0.0)
+            # Ignore stages too short to time reliably
+            if before > 0.01 and now > before * (1 + tolerance):
+                regressions.append("{}: stage '{}' {:.3f}s vs baseline {:.3f}s".format(label, stage, now, before))
+    return regressions
+
+
+def print_table(results):
+    widths = {stage: max(7, len(stage)) for stage in STAGES}
+    header = f"{'size':>5} {'n':>5} {'regions':>7} {'wrk':>3} | {'img/s':>7} | " + \
+             " ".join(f"{stage:>{widths[stage]}}" for stage in STAGES) + f" | {'RSS MB':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        regions = "{}-{}".format(r["min_regions"], r["max_regions"])
+        stages = " ".join(f"{r['stages'].get(stage, 0.0):{widths[stage]}.3f}" for stage in STAGES)
+        rss = max(r["peak_rss_mb"], r["peak_worker_rss_mb"])
+        print(f"{r['image_size']:5} {r['num_images']:5} {regions:>7} {r['workers']:3} | "
+              f"{r['images_per_sec']:7.1f} | {stages} | {rss:7.1f}")
+
+
+def parse_regions(value):
+    low, _, high = value.partition("-")
+    return int(low), int(high or low)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark dataset generation throughput")
+    parser.add_argument("--image_sizes", type=int, nargs="+", default=[256, 512])
+    parser.add_argument("--n", type=int, nargs="+", default=[50], help="image counts")
+    parser.add_argument("--regions", type=parse_regions, nargs="+", default=[(3, 8)],
+                        metavar="MIN-MAX", help="region count ranges, e.g. 3-8")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--png_mode", default="rgb")
+    parser.add_argument("--out", help="write results JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown fraction before flagging a regression")
+    parser.add_argument("--run-config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        print(json.dumps(run_config(**json.loads(args.run_config))))
+        return
+
+    results = []
+    for image_size in args.image_sizes:
+        for num_images in args.n:
+            for min_regions, max_regions in args.regions:
+                for workers in args.workers:
+                    results.append(run_config_isolated({
+                        "image_size": image_size, "num_images": num_images,
+                        "min_regions": min_regions, "max_regions": max_regions,
+                        "workers": workers, "png_mode": args.png_mode,
+                    }))
+    print_table(results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to: {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark PNG output modes for generated images.
+
+For every PNG mode and compression level, renders the same seeded images
+and reports bytes per image, ms per save and ms per load (open + decode to
+RGB pixels).
+
+Usage: python benchmark_png.py [--n 20] [--image_size 512] [--levels 1 6 9] [--json out.json]
+"""
+
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_inputs import PNG_MODES, image_seed, render_image, save_png
+
+
+def benchmark_png_modes(num_images=20, image_size=512, levels=(1, 6, 9), seed=0):
+    """Return one result dict per (png_mode, compress_level) pair."""
+    rendered = [render_image(image_seed(seed, i), image_size)[:2] for i in range(1, num_images + 1)]
+    results = []
+    for png_mode in PNG_MODES:
+        for level in levels:
+            total_bytes = 0
+            save_time = 0.0
+            load_time = 0.0
+            for img, label_map in rendered:
+                buffer = io.BytesIO()
+                start = time.perf_counter()
+                save_png(buffer, img, label_map, png_mode, level)
+                save_time += time.perf_counter() - start
+                total_bytes += buffer.tell()
+
+                buffer.seek(0)
+                start = time.perf_counter()
+                with Image.open(buffer) as decoded:
+                    pixels = np.asarray(decoded.convert("RGB"))
+                load_time += time.perf_counter() - start
+                if not np.array_equal(pixels, np.asarray(img)):
+                    raise AssertionError("{} PNG did not round-trip".format(png_mode))
+
+            results.append({
+                "png_mode": png_mode,
+                "compress_level": level,
+                "bytes_per_image": total_bytes / num_images,
+                "save_ms": 1000 * save_time / num_images,
+                "load_ms": 1000 * load_time / num_images,
+            })
+    return results
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=20, help="number of images")
+    parser.add_argument("--image_size", type=int, default=512)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9], help="compression levels")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = benchmark_png_modes(args.n, args.image_size, args.levels, args.seed)
+
+    print(f"{'mode':8} | {'level':5} | {'bytes/image':>11} | {'save ms':>8} | {'load ms':>8}")
+    print("-" * 52)
+    for r in results:
+        print(f"{r['png_mode']:8} | {r['compress_level']:5} | {r['bytes_per_image']:11.0f} | "
+              f"{r['save_ms']:8.2f} | {r['load_ms']:8.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
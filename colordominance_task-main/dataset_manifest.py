@@ -0,0 +1,75 @@
+"""
+Generation manifest used to resume interrupted dataset runs.
+
+The manifest is a JSONL file with one record per finished image::
+
+    {"filename": "image_1.png", "seed": 123, "params": {...},
+     "sha256": "...", "label": "red", "areas": {"red": 51234, ...}}
+
+Records are appended as images finish, so a run that dies keeps
+everything written so far.  When a file appears more than once, the last
+record wins.  An entry stays valid while its file exists with the
+recorded hash and its seed and params match the current run.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path):
+    """Return ``{filename: record}``, ignoring a torn final line."""
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record["filename"]] = record
+    return records
+
+
+def is_valid(record, seed, params, image_path):
+    """True if ``record`` matches the expected seed/params and the file on disk."""
+    if record is None or record.get("seed") != seed or record.get("params") != params:
+        return False
+    try:
+        return file_sha256(image_path) == record.get("sha256")
+    except OSError:
+        return False
+
+
+def append_record(f, filename, seed, params, sha256, label, areas=None):
+    record = {
+        "filename": filename,
+        "seed": seed,
+        "params": params,
+        "sha256": sha256,
+        "label": label,
+    }
+    if areas is not None:
+        record["areas"] = areas
+    f.write(json.dumps(record) + "\n")
+    f.flush()
+
+
+def write_manifest(path, records):
+    """Atomically rewrite the manifest with one record per file, in order."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,76 @@
+"""
+Client for the local evaluation server (see eval_server).
+
+Only the standard library is used, so harness scripts can import this
+without the benchmark framework.  ``is_running`` is a cheap health check
+to decide whether to use the server or evaluate in-process.
+
+The server address is ``COLORDOMINANCE_EVAL_SERVER`` (``host:port``),
+defaulting to ``DEFAULT_ADDRESS``.
+"""
+
+import json
+import os
+import urllib.error
+import urllib.request
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+
+class EvaluationServerError(RuntimeError):
+    """The server answered with an error status."""
+
+
+def server_address():
+    return os.environ.get("COLORDOMINANCE_EVAL_SERVER", DEFAULT_ADDRESS)
+
+
+def _request(path, payload=None, timeout=60.0):
+    url = "http://{}{}".format(server_address(), path)
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        raise EvaluationServerError("{} {}: {}".format(e.code, path, message)) from None
+
+
+def health(timeout=1.0):
+    """The server's status dict; raises OSError if it is not reachable."""
+    return _request("/health", timeout=timeout)
+
+
+def is_running(timeout=0.2):
+    try:
+        return health(timeout).get("status") == "ok"
+    except (OSError, ValueError, EvaluationServerError):
+        return False
+
+
+def evaluate(solution_folder=None, solution_path=None, predictions=None, ground_truth=None, timeout=600.0):
+    """Score one solution on the server and return the result as a dict.
+
+    Give exactly one of ``solution_folder`` (looked up like
+    ``ColorDominanceEvaluator.evaluate``), ``solution_path`` (a .json or
+    .jsonl file) or ``predictions`` (a ``{filename: color}`` dict).
+    ``ground_truth`` is a ground-truth JSON path; by default the server's
+    own is used.  Paths are resolved here, since the server may run in
+    another directory.
+    """
+    payload = {}
+    if solution_folder is not None:
+        payload["solution_folder"] = os.path.abspath(solution_folder)
+    if solution_path is not None:
+        payload["solution_path"] = os.path.abspath(solution_path)
+    if predictions is not None:
+        payload["predictions"] = predictions
+    if len(payload) != 1:
+        raise ValueError("give exactly one of solution_folder, solution_path or predictions")
+    if ground_truth is not None:
+        payload["ground_truth"] = os.path.abspath(ground_truth)
+    return _request("/evaluate", payload, timeout)
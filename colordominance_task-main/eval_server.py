@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Local evaluation server.
+
+Harness processes that score solutions one at a time each pay interpreter
+startup and a ground-truth load.  This server keeps both warm: an asyncio
+HTTP front end accepts requests, and scoring runs on a bounded process
+pool whose workers keep their parsed ground truth cached between requests.
+Responses are ``EvaluationResult`` objects serialized as JSON.
+
+Endpoints:
+- ``GET /health``: status, worker count and in-flight request count
+- ``POST /evaluate``: body ``{"solution_folder": ...}``,
+  ``{"solution_path": ...}`` or ``{"predictions": {...}}``, optionally
+  with ``"ground_truth": <path>`` to score against another dataset
+
+Requests beyond ``--queue`` wait for a free slot before they are handed to
+the pool.  eval_client is the matching client.
+
+Usage: python eval_server.py [--port 8765] [--workers N] [--ground_truth ground_truth_colors.json]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import eval_client
+import scoring
+from evaluator import ColorDominanceEvaluator, PhaseTimer
+
+MAX_BODY_BYTES = 256 * 1024 * 1024
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _score(ground_truth_path, solution_path=None, predictions=None):
+    """Worker entry point: ``(metrics, seconds, error_message)`` for one solution.
+
+    Ground truth goes through the evaluator's per-process cache, so each
+    worker parses a dataset once and reloads it only when the file changes.
+    """
+    start_time = time.time()
+    timer = PhaseTimer()
+    try:
+        ground_truth = ColorDominanceEvaluator._load_ground_truth_json(ground_truth_path, timer)
+        if solution_path is not None:
+            predictions = ColorDominanceEvaluator._load_predictions(solution_path, ground_truth, timer)
+        else:
+            with timer.phase("normalize_solution"):
+                predictions = scoring.normalize_predictions(predictions)
+        with timer.phase("score"):
+            metrics = ColorDominanceEvaluator._calculate_metrics(predictions, ground_truth)
+        metrics.update(timer.as_metrics())
+        return metrics, time.time() - start_time, None
+    except Exception as e:
+        return None, time.time() - start_time, f"Evaluation error: {str(e)}"
+
+
+def result_to_dict(result):
+    return {
+        "task_id": result.task_id,
+        "agent_id": result.agent_id,
+        "timestamp": result.timestamp.isoformat(),
+        "metrics": result.metrics,
+        "success": result.success,
+        "execution_time": result.execution_time,
+        "error_message": result.error_message,
+    }
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class EvaluationServer:
+    def __init__(self, config, ground_truth_path, workers=None, queue_size=None):
+        self.evaluator = ColorDominanceEvaluator(config)
+        self.ground_truth_path = os.path.abspath(ground_truth_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.slots = asyncio.Semaphore(queue_size or 4 * self.workers)
+        self.in_flight = 0
+
+    async def warm_up(self):
+        """Load the default ground truth in every worker before serving."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, _score, self.ground_truth_path, None, {})
+                               for _ in range(self.workers)])
+
+    async def evaluate(self, payload):
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        sources = [key for key in ("solution_folder", "solution_path", "predictions") if key in payload]
+        if len(sources) != 1:
+            raise HTTPError(400, "give exactly one of solution_folder, solution_path or predictions")
+        for key in ("solution_folder", "solution_path", "ground_truth"):
+            # os.path.exists() treats an int as a file descriptor
+            if key in payload and not isinstance(payload[key], str):
+                raise HTTPError(400, f"{key} must be a string path")
+        ground_truth_path = payload.get("ground_truth", self.ground_truth_path)
+        if not os.path.exists(ground_truth_path):
+            raise HTTPError(400, f"Ground truth file {ground_truth_path} not found")
+
+        start_time = time.time()
+        solution_path, predictions = payload.get("solution_path"), payload.get("predictions")
+        if "solution_folder" in payload:
+            solution_file_name = self.evaluator.config["expected_outputs"]["solution_file"]
+            solution_path = self.evaluator._find_solution_file(payload["solution_folder"], solution_file_name)
+            if solution_path is None:
+                return self.evaluator._failure_result(time.time() - start_time,
+                                                      f"Solution file {solution_file_name} not found")
+        elif predictions is not None and not isinstance(predictions, dict):
+            raise HTTPError(400, "predictions must be an object")
+        elif solution_path is not None and not os.path.exists(solution_path):
+            return self.evaluator._failure_result(time.time() - start_time,
+                                                  f"Solution file {solution_path} not found")
+
+        async with self.slots:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                metrics, seconds, error = await loop.run_in_executor(
+                    self.executor, _score, ground_truth_path, solution_path, predictions)
+            finally:
+                self.in_flight -= 1
+        if metrics is None:
+            return self.evaluator._failure_result(seconds, error)
+        return self.evaluator._scored_result(metrics, seconds)
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return {"status": "ok", "workers": self.workers, "in_flight": self.in_flight,
+                    "ground_truth": self.ground_truth_path}
+        if path == "/evaluate":
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError as e:
+                raise HTTPError(400, f"invalid JSON: {e}")
+            return result_to_dict(await self.evaluate(payload))
+        raise HTTPError(404, f"no route for {path}")
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                if len(request_line) < 2:
+                    raise HTTPError(400, "malformed request line")
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    raise HTTPError(413, "request body too large")
+                body = await reader.readexactly(length) if length else b""
+                status, response = 200, await self.route(request_line[0], request_line[1], body)
+            except HTTPError as e:
+                status, response = e.status, {"error": str(e)}
+            except Exception as e:
+                status, response = 500, {"error": str(e)}
+
+            data = json.dumps(response, default=str).encode("utf-8")
+            writer.write("HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n"
+                         "Connection: close\r\n\r\n".format(status, HTTP_REASONS[status], len(data)).encode("latin-1"))
+            writer.write(data)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+async def serve(config, ground_truth_path, host, port, workers=None, queue_size=None):
+    server = EvaluationServer(config, ground_truth_path, workers, queue_size)
+    try:
+        await server.warm_up()
+        listener = await asyncio.start_server(server.handle, host, port)
+        print(f"Evaluation server on http://{host}:{port} with {server.workers} workers "
+              f"(ground truth: {server.ground_truth_path})")
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main():
+    import argparse
+    task_dir = os.path.dirname(os.path.abspath(__file__))
+    host, _, port = eval_client.DEFAULT_ADDRESS.partition(":")
+    parser = argparse.ArgumentParser(description="Serve ColorDominanceEvaluator over local HTTP")
+    parser.add_argument("--host", default=host)
+    parser.add_argument("--port", type=int, default=int(port))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queue", type=int, default=None,
+                        help="requests scored at once before new ones wait (default: 4 per worker)")
+    parser.add_argument("--config", default=os.path.join(task_dir, "config.json"))
+    parser.add_argument("--ground_truth", default=None,
+                        help="default ground-truth JSON (default: the one named in config.json)")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        config = json.load(f)
+    ground_truth_path = args.ground_truth or os.path.join(
+        os.path.dirname(os.path.abspath(args.config)), config["expected_outputs"]["ground_truth_file"])
+    try:
+        asyncio.run(serve(config, ground_truth_path, args.host, args.port, args.workers, args.queue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,149 @@
 import json
 import os
+import sys
+import threading
 import time
-from typing import Any, Dict, List
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from benchmark.core.base_evaluator import BaseEvaluator
 from benchmark.core.result_types import EvaluationResult
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scoring
+from scoring import EMPTY_METRICS
+
+# Process-level cache of normalized ground truth, keyed by
+# (absolute path, mtime_ns, size) and evicted least-recently-used first.
+# Cached dicts are shared between callers and must not be mutated.
+GROUND_TRUTH_CACHE_SIZE = 8
+_ground_truth_cache: "OrderedDict[Tuple[str, int, int], Dict[str, str]]" = OrderedDict()
+_ground_truth_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_ground_truth_cache_lock = threading.Lock()
+
+
+def ground_truth_cache_info() -> Dict[str, int]:
+    """Hit/miss/eviction counters and current size of the ground-truth cache."""
+    with _ground_truth_cache_lock:
+        return dict(_ground_truth_cache_stats, size=len(_ground_truth_cache),
+                    max_size=GROUND_TRUTH_CACHE_SIZE)
+
+
+def clear_ground_truth_cache() -> None:
+    """Drop every cached dataset and reset the counters."""
+    with _ground_truth_cache_lock:
+        _ground_truth_cache.clear()
+        for key in _ground_truth_cache_stats:
+            _ground_truth_cache_stats[key] = 0
+
+
+# Phases timed by evaluate, in order
+PHASES = ("find_solution", "read_ground_truth", "parse_ground_truth", "normalize_ground_truth",
+          "verify_pixels", "read_solution", "parse_solution", "normalize_solution", "score")
+
+
+class EvaluationHooks:
+    """Receives evaluation instrumentation; subclass and override what you need.
+
+    Pass instances to ``ColorDominanceEvaluator(config, hooks=[...])`` to
+    forward phase timings to an external metrics sink.  Exceptions raised
+    by a hook are turned into warnings and never fail an evaluation.
+    """
+
+    def on_phase(self, phase: str, seconds: float, num_bytes: int) -> None:
+        """Called once per phase that ran; ``num_bytes`` is 0 for non-I/O phases."""
+
+    def on_result(self, result: EvaluationResult) -> None:
+        """Called with every finished result, successful or not."""
+
+
+class PhaseTimer:
+    """Accumulates wall time and bytes read per evaluation phase."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+        self.bytes: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float, num_bytes: int = 0) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        if num_bytes:
+            self.bytes[name] = self.bytes.get(name, 0) + num_bytes
+
+    def as_metrics(self) -> Dict[str, Dict[str, float]]:
+        return {
+            "phase_seconds": {name: self.seconds[name] for name in PHASES if name in self.seconds},
+            "bytes_read": {name: self.bytes[name] for name in PHASES if name in self.bytes},
+        }
+
+    @classmethod
+    def from_metrics(cls, metrics: Dict[str, Any]) -> "PhaseTimer":
+        """Timer holding the ``as_metrics`` timings of a result (empty if it has none)."""
+        timer = cls()
+        timer.seconds.update(metrics.get("phase_seconds", {}))
+        timer.bytes.update(metrics.get("bytes_read", {}))
+        return timer
+
+
+class _NullTimer(PhaseTimer):
+    """Stand-in for callers that do not collect timings."""
+
+    def add(self, name: str, seconds: float, num_bytes: int = 0) -> None:
+        pass
+
+
+_NO_TIMER = _NullTimer()
+
+
+def _timed_lines(f, seconds: List[float]):
+    """Yield the lines of ``f``, adding the time spent reading them to ``seconds[0]``."""
+    lines = iter(f)
+    while True:
+        start = time.perf_counter()
+        line = next(lines, None)
+        seconds[0] += time.perf_counter() - start
+        if line is None:
+            return
+        yield line
+
+
+# Ground truth shared with evaluate_many worker processes
+_WORKER_GROUND_TRUTH: Dict[str, str] = {}
+
+
+def _init_worker(ground_truth: Dict[str, str]) -> None:
+    global _WORKER_GROUND_TRUTH
+    _WORKER_GROUND_TRUTH = ground_truth
+
+
+def _score_solution(solution_path: str) -> Tuple[Optional[Dict[str, float]], float, Optional[str]]:
+    """Parse and score one solution file against the worker's ground truth.
+
+    Returns ``(metrics, seconds, error_message)``; ``metrics`` is None on error.
+    """
+    start_time = time.time()
+    timer = PhaseTimer()
+    try:
+        predictions = ColorDominanceEvaluator._load_predictions(solution_path, _WORKER_GROUND_TRUTH, timer)
+        with timer.phase("score"):
+            metrics = ColorDominanceEvaluator._calculate_metrics(predictions, _WORKER_GROUND_TRUTH)
+        metrics.update(timer.as_metrics())
+        return metrics, time.time() - start_time, None
+    except Exception as e:
+        return None, time.time() - start_time, f"Evaluation error: {str(e)}"
+
 
 class ColorDominanceEvaluator(BaseEvaluator):
     """
@@ -14,29 +151,36 @@ class ColorDominanceEvaluator(BaseEvaluator):
     Compares predicted dominant colors against ground truth using accuracy.
     """
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], hooks: Optional[List[EvaluationHooks]] = None,
+                 verify_pixels: bool = False, verify_workers: Optional[int] = None):
         self.config = config
         self.accuracy_threshold = config.get("evaluation_criteria", {}).get("accuracy_threshold", 1.0)
+        self.hooks = list(hooks or [])
+        self.verify_pixels = verify_pixels
+        self.verify_workers = verify_workers or os.cpu_count() or 1
         self.print_task_info()
 
     def evaluate(self, solution_folder: str, solution_config: Any = None) -> EvaluationResult:
+        """Score one solution folder.
+
+        Wall time and bytes read per phase (see ``PHASES``) are added to the
+        metrics as ``phase_seconds`` and ``bytes_read`` and sent to hooks.
+        """
+        timer = PhaseTimer()
+        result = self._evaluate_timed(solution_folder, solution_config, timer)
+        result.metrics.update(timer.as_metrics())
+        self._notify_hooks(timer, result)
+        return result
+
+    def _evaluate_timed(self, solution_folder: str, solution_config: Any, timer: PhaseTimer) -> EvaluationResult:
         start_time = time.time()
         try:
             solution_file_name = self.config["expected_outputs"]["solution_file"]
-            solution_path = os.path.join(solution_folder, solution_file_name)
+            with timer.phase("find_solution"):
+                solution_path = self._find_solution_file(solution_folder, solution_file_name)
 
-            if not os.path.exists(solution_path):
-                return EvaluationResult(
-                    task_id=self.config["task_id"],
-                    agent_id="unknown",
-                    timestamp=datetime.now(),
-                    metrics={"accuracy": 0.0, "total_images": 0, "correct_predictions": 0, "missing_predictions": 0},
-                    success=False,
-                    execution_time=time.time() - start_time,
-                    error_message=f"Solution file {solution_file_name} not found",
-                )
-
-            predictions = self._load_predictions_json(solution_path)
+            if solution_path is None:
+                return self._failure_result(time.time() - start_time, f"Solution file {solution_file_name} not found")
 
             # Load ground truth
             if solution_config is not None:
@@ -46,78 +190,211 @@ class ColorDominanceEvaluator(BaseEvaluator):
                 task_dir = os.path.dirname(__file__)
                 gt_path = os.path.join(task_dir, gt_file)
                 if not os.path.exists(gt_path):
-                    return EvaluationResult(
-                        task_id=self.config["task_id"],
-                        agent_id="unknown",
-                        timestamp=datetime.now(),
-                        metrics={"accuracy": 0.0, "total_images": 0, "correct_predictions": 0, "missing_predictions": 0},
-                        success=False,
-                        execution_time=time.time() - start_time,
-                        error_message=f"Ground truth file {gt_file} not found",
-                    )
-                ground_truth = self._load_ground_truth_json(gt_path)
-
-            metrics = self._calculate_metrics(predictions, ground_truth)
-            success = metrics["accuracy"] >= self.accuracy_threshold
-
-            return EvaluationResult(
-                task_id=self.config["task_id"],
-                agent_id="unknown",
-                timestamp=datetime.now(),
-                metrics=metrics,
-                success=success,
-                execution_time=time.time() - start_time,
-                error_message=None if success else f"Accuracy {metrics['accuracy']:.3f} below threshold {self.accuracy_threshold}",
-            )
+                    return self._failure_result(time.time() - start_time, f"Ground truth file {gt_file} not found")
+                ground_truth = self._load_ground_truth_json(gt_path, timer)
+
+            verification = None
+            if self.verify_pixels:
+                with timer.phase("verify_pixels"):
+                    verification = self.verify_ground_truth(ground_truth)
+
+            predictions = self._load_predictions(solution_path, ground_truth, timer)
+            with timer.phase("score"):
+                metrics = self._calculate_metrics(predictions, ground_truth)
+            if verification is not None:
+                metrics["pixel_verification"] = verification
+            return self._scored_result(metrics, time.time() - start_time)
         except Exception as e:
-            return EvaluationResult(
-                task_id=self.config["task_id"],
-                agent_id="unknown",
-                timestamp=datetime.now(),
-                metrics={"accuracy": 0.0, "total_images": 0, "correct_predictions": 0, "missing_predictions": 0},
-                success=False,
-                execution_time=time.time() - start_time,
-                error_message=f"Evaluation error: {str(e)}",
-            )
-
-    def _load_predictions_json(self, json_path: str) -> Dict[str, str]:
-        with open(json_path, "r") as f:
-            data = json.load(f)
-        preds = data.get("predictions", {})
+            return self._failure_result(time.time() - start_time, f"Evaluation error: {str(e)}")
+
+    def verify_ground_truth(self, ground_truth: Dict[str, str], input_dir: Optional[str] = None) -> Dict[str, Any]:
+        """Recompute dominant colors from the task images and compare them to ``ground_truth``.
+
+        See ``verify_dataset.verify_dataset`` for the returned report.
+        ``input_dir`` defaults to the task's configured input directory.
+        """
+        from verify_dataset import verify_dataset
+
+        task_dir = os.path.dirname(os.path.abspath(__file__))
+        if input_dir is None:
+            input_dir = os.path.join(task_dir, self.config.get("input_dir", "input"))
+        return verify_dataset(input_dir, ground_truth, self.verify_workers)
+
+    def _notify_hooks(self, timer: PhaseTimer, result: EvaluationResult) -> None:
+        for hook in self.hooks:
+            try:
+                for phase in PHASES:
+                    if phase in timer.seconds:
+                        hook.on_phase(phase, timer.seconds[phase], timer.bytes.get(phase, 0))
+                hook.on_result(result)
+            except Exception as e:
+                warnings.warn(f"Evaluation hook {type(hook).__name__} failed: {e}")
+
+    def evaluate_many(self, solution_folders: List[str], solution_config: Any = None,
+                      max_workers: Optional[int] = None) -> List[EvaluationResult]:
+        """Evaluate many solution folders against one load of the ground truth.
+
+        Solutions are parsed and scored in parallel worker processes that
+        receive the normalized ground truth once, at startup.  Results are
+        returned in the order of ``solution_folders``; each one's
+        ``execution_time`` covers parsing and scoring that folder.  Hooks
+        receive every result with its own parse and score phases.
+        """
+        start_time = time.time()
+        solution_file_name = self.config["expected_outputs"]["solution_file"]
+
+        if solution_config is not None:
+            ground_truth = solution_config
+        else:
+            gt_file = self.config["expected_outputs"]["ground_truth_file"]
+            gt_path = os.path.join(os.path.dirname(__file__), gt_file)
+            if not os.path.exists(gt_path):
+                return [self._failure_result(time.time() - start_time, f"Ground truth file {gt_file} not found")
+                        for _ in solution_folders]
+            ground_truth = self._load_ground_truth_json(gt_path)
+
+        results: List[Optional[EvaluationResult]] = [None] * len(solution_folders)
+        pending = []
+        for i, folder in enumerate(solution_folders):
+            solution_path = self._find_solution_file(folder, solution_file_name)
+            if solution_path is not None:
+                pending.append((i, solution_path))
+            else:
+                results[i] = self._failure_result(time.time() - start_time, f"Solution file {solution_file_name} not found")
+
+        paths = [path for _, path in pending]
+        if max_workers == 1 or len(paths) <= 1:
+            _init_worker(ground_truth)
+            scored = [_score_solution(path) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(ground_truth,)) as executor:
+                scored = list(executor.map(_score_solution, paths, chunksize=max(1, len(paths) // 64)))
+
+        for (i, _), (metrics, seconds, error) in zip(pending, scored):
+            if metrics is None:
+                results[i] = self._failure_result(seconds, error)
+            else:
+                results[i] = self._scored_result(metrics, seconds)
+        for result in results:
+            self._notify_hooks(PhaseTimer.from_metrics(result.metrics), result)
+        return results
+
+    def _failure_result(self, execution_time: float, error_message: str) -> EvaluationResult:
+        return EvaluationResult(
+            task_id=self.config["task_id"],
+            agent_id="unknown",
+            timestamp=datetime.now(),
+            metrics=dict(EMPTY_METRICS),
+            success=False,
+            execution_time=execution_time,
+            error_message=error_message,
+        )
+
+    def _scored_result(self, metrics: Dict[str, float], execution_time: float) -> EvaluationResult:
+        success = metrics["accuracy"] >= self.accuracy_threshold
+        return EvaluationResult(
+            task_id=self.config["task_id"],
+            agent_id="unknown",
+            timestamp=datetime.now(),
+            metrics=metrics,
+            success=success,
+            execution_time=execution_time,
+            error_message=None if success else f"Accuracy {metrics['accuracy']:.3f} below threshold {self.accuracy_threshold}",
+        )
+
+    @staticmethod
+    def _find_solution_file(solution_folder: str, solution_file_name: str) -> Optional[str]:
+        """Path of the solution file, falling back to its line-delimited ``.jsonl`` twin."""
+        solution_path = os.path.join(solution_folder, solution_file_name)
+        if os.path.exists(solution_path):
+            return solution_path
+        jsonl_path = os.path.splitext(solution_path)[0] + ".jsonl"
+        if os.path.exists(jsonl_path):
+            return jsonl_path
+        return None
+
+    @staticmethod
+    def _load_predictions(solution_path: str, ground_truth: Dict[str, str],
+                          timer: PhaseTimer = _NO_TIMER) -> Dict[str, str]:
+        if solution_path.endswith(".jsonl"):
+            return ColorDominanceEvaluator._load_predictions_jsonl(solution_path, ground_truth, timer)
+        return ColorDominanceEvaluator._load_predictions_json(solution_path, timer)
+
+    @staticmethod
+    def _load_predictions_jsonl(jsonl_path: str, ground_truth: Dict[str, str],
+                                timer: PhaseTimer = _NO_TIMER) -> Dict[str, str]:
+        """Stream a line-delimited predictions file.
+
+        Each non-blank line is ``{"filename": ..., "color": ...}``.  Lines are
+        parsed one at a time and only predictions for ground-truth images are
+        kept, so memory is bounded by the ground truth, not the file.  A later
+        line for the same image overrides an earlier one.
+
+        Reading and parsing are interleaved, so fetching each line from the
+        file is timed as ``read_solution`` and the rest of the pass
+        (parsing and normalizing) as ``parse_solution``.
+        """
         normalized: Dict[str, str] = {}
-        for filename, value in preds.items():
-            if isinstance(value, str):
-                normalized[filename] = value.lower().strip()
+        read_seconds = [0.0]
+        start = time.perf_counter()
+        with open(jsonl_path, "r") as f:
+            lines = _timed_lines(f, read_seconds)
+            for filename, value in scoring.iter_predictions_jsonl(lines, os.path.basename(jsonl_path)):
+                if filename in ground_truth and isinstance(value, str):
+                    normalized[filename] = scoring.normalize_label(value)
+            num_bytes = f.tell()
+        timer.add("read_solution", read_seconds[0], num_bytes)
+        timer.add("parse_solution", time.perf_counter() - start - read_seconds[0])
         return normalized
 
-    def _load_ground_truth_json(self, json_path: str) -> Dict[str, str]:
-        with open(json_path, "r") as f:
-            data = json.load(f)
-        return {k: v.lower().strip() for k, v in data.items()}
+    @staticmethod
+    def _load_predictions_json(json_path: str, timer: PhaseTimer = _NO_TIMER) -> Dict[str, str]:
+        with timer.phase("read_solution"):
+            with open(json_path, "rb") as f:
+                raw = f.read()
+        timer.add("read_solution", 0.0, len(raw))
+        with timer.phase("parse_solution"):
+            data = json.loads(raw)
+        with timer.phase("normalize_solution"):
+            return scoring.normalize_predictions(data.get("predictions", {}))
 
-    def _calculate_metrics(self, predictions: Dict[str, str], ground_truth: Dict[str, str]) -> Dict[str, float]:
-        if not ground_truth:
-            return {"accuracy": 0.0, "total_images": 0, "correct_predictions": 0, "missing_predictions": 0}
+    @staticmethod
+    def _load_ground_truth_json(json_path: str, timer: PhaseTimer = _NO_TIMER) -> Dict[str, str]:
+        path = os.path.abspath(json_path)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with _ground_truth_cache_lock:
+            cached = _ground_truth_cache.get(key)
+            if cached is not None:
+                _ground_truth_cache.move_to_end(key)
+                _ground_truth_cache_stats["hits"] += 1
+                return cached
+            _ground_truth_cache_stats["misses"] += 1
 
-        correct = 0
-        total = len(ground_truth)
-        missing = 0
+        with timer.phase("read_ground_truth"):
+            with open(path, "rb") as f:
+                raw = f.read()
+        timer.add("read_ground_truth", 0.0, len(raw))
+        with timer.phase("parse_ground_truth"):
+            data = json.loads(raw)
+        with timer.phase("normalize_ground_truth"):
+            ground_truth = scoring.normalize_ground_truth(data)
 
-        for filename, true_color in ground_truth.items():
-            pred_color = predictions.get(filename)
-            if pred_color is None:
-                missing += 1
-                continue
-            if pred_color == true_color:
-                correct += 1
+        with _ground_truth_cache_lock:
+            # A changed file replaces its stale entry instead of crowding others out
+            for stale in [k for k in _ground_truth_cache if k[0] == path and k != key]:
+                del _ground_truth_cache[stale]
+            _ground_truth_cache[key] = ground_truth
+            while len(_ground_truth_cache) > GROUND_TRUTH_CACHE_SIZE:
+                _ground_truth_cache.popitem(last=False)
+                _ground_truth_cache_stats["evictions"] += 1
+        return ground_truth
 
-        accuracy = correct / total if total > 0 else 0.0
-        return {
-            "accuracy": accuracy,
-            "total_images": float(total),
-            "correct_predictions": float(correct),
-            "missing_predictions": float(missing),
-        }
+    @staticmethod
+    def _calculate_metrics(predictions: Dict[str, str], ground_truth: Dict[str, str]) -> Dict[str, Any]:
+        """Accuracy plus a confusion matrix and per-color precision/recall (see scoring)."""
+        return scoring.score(predictions, ground_truth)
 
     def get_metrics(self) -> List[str]:
         return [
@@ -125,6 +402,14 @@ class ColorDominanceEvaluator(BaseEvaluator):
             "total_images",
             "correct_predictions",
             "missing_predictions",
+            "wrong_predictions",
+            "macro_precision",
+            "macro_recall",
+            "per_color",
+            "confusion_matrix",
+            "phase_seconds",
+            "bytes_read",
+            "pixel_verification",
         ]
 
     def generate_report(self, results: List[EvaluationResult]) -> str:
@@ -144,8 +429,57 @@ class ColorDominanceEvaluator(BaseEvaluator):
                 lines.append(f"  Error: {result.error_message}")
             lines.append("  Metrics:")
             for metric, value in result.metrics.items():
-                if metric in ("accuracy",):
+                if metric in ("per_color", "confusion_matrix", "phase_seconds", "bytes_read", "pixel_verification"):
+                    continue
+                if metric in ("accuracy", "macro_precision", "macro_recall"):
                     lines.append(f"    {metric}: {value:.3f} ({value*100:.1f}%)")
                 else:
                     lines.append(f"    {metric}: {value}")
+            if result.metrics.get("pixel_verification"):
+                lines.extend(self._format_verification(result.metrics["pixel_verification"]))
+            if result.metrics.get("phase_seconds"):
+                lines.extend(self._format_phases(result.metrics["phase_seconds"],
+                                                 result.metrics.get("bytes_read", {})))
+            if result.metrics.get("per_color"):
+                lines.append("  Per-color:")
+                lines.append(f"    {'color':10} {'precision':>9} {'recall':>7} {'support':>7} {'predicted':>9}")
+                for color, stats in result.metrics["per_color"].items():
+                    lines.append(f"    {color:10} {stats['precision']:9.3f} {stats['recall']:7.3f} "
+                                 f"{stats['support']:7d} {stats['predicted']:9d}")
+            if result.metrics.get("confusion_matrix"):
+                lines.extend(self._format_confusion_matrix(result.metrics["confusion_matrix"]))
         return "\n".join(lines)
+
+    @staticmethod
+    def _format_verification(verification: Dict[str, Any], limit: int = 20) -> List[str]:
+        mismatches = verification["mismatches"]
+        lines = [f"  Pixel verification: {verification['checked']} images checked "
+                 f"({verification['cached']} cached), {len(mismatches)} ground-truth mismatches, "
+                 f"{len(verification['missing_images'])} missing images, "
+                 f"{len(verification['blank_images'])} blank images not checked"]
+        for mismatch in mismatches[:limit]:
+            lines.append(f"    WARNING {mismatch['filename']}: labeled {mismatch['expected']}, "
+                         f"pixels say {mismatch['actual']}")
+        if len(mismatches) > limit:
+            lines.append(f"    ... and {len(mismatches) - limit} more")
+        return lines
+
+    @staticmethod
+    def _format_phases(phase_seconds: Dict[str, float], bytes_read: Dict[str, int]) -> List[str]:
+        lines = ["  Phases:"]
+        for phase, seconds in phase_seconds.items():
+            line = f"    {phase:24} {seconds * 1000:10.2f} ms"
+            if phase in bytes_read:
+                line += f"  {bytes_read[phase]:>12,} bytes"
+            lines.append(line)
+        return lines
+
+    @staticmethod
+    def _format_confusion_matrix(confusion: Dict[str, Any]) -> List[str]:
+        columns = confusion["columns"]
+        width = max(7, max(len(c) for c in columns) + 1)
+        lines = ["  Confusion matrix (rows: truth, columns: prediction):"]
+        lines.append("    " + " " * 10 + "".join(f"{c[:width - 1]:>{width}}" for c in columns))
+        for label, row in zip(confusion["labels"], confusion["counts"]):
+            lines.append(f"    {label:10}" + "".join(f"{n:>{width}}" for n in row))
+        return lines
@@ -2,8 +2,20 @@ import os
 import json
 import random
 import math
+import hashlib
+import io
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+import numpy as np
 from PIL import Image, ImageDraw
 
+import area_index
+import dataset_manifest
+import packed_dataset
+from palette_lut import get_lut, pack_rgb
+
 # Define color palette with RGB values and names
 COLORS = {
     "red": (255, 0, 0),
@@ -19,19 +31,49 @@ COLORS = {
     "white": (255, 255, 255)
 }
 
-def draw_random_shape(draw, color, image_size):
-    """Draw a random shape (rectangle, circle, or polygon) with the given color."""
+# Label raster values: 0 is the untouched background, i + 1 is the i-th color
+BACKGROUND_LABEL = 0
+COLOR_LABELS = {name: i + 1 for i, name in enumerate(COLORS)}
+LABEL_PALETTE = [(255, 255, 255)] + list(COLORS.values())
+
+# Base path (inside the output directory) of the optional packed dataset
+PACKED_BASENAME = "images_packed"
+
+# PNG flavours save_png can write
+PNG_MODES = ("rgb", "palette")
+
+@contextmanager
+def stage_timer(timings, stage):
+    """Add the seconds spent in the block to ``timings[stage]``; no-op when ``timings`` is None."""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+def random_shape(image_size, rng=random):
+    """Pick a random shape as ``(shape_type, x, y, size)`` without drawing it."""
     # Random position and size
-    size = random.randint(30, min(120, image_size // 3))
-    x = random.randint(0, image_size - size)
-    y = random.randint(0, image_size - size)
-    
-    shape_type = random.choice(["rectangle", "circle", "polygon"])
+    size = rng.randint(30, min(120, image_size // 3))
+    x = rng.randint(0, image_size - size)
+    y = rng.randint(0, image_size - size)
     
+    shape_type = rng.choice(["rectangle", "circle", "polygon"])
+    return shape_type, x, y, size
+
+def draw_shape(draw, shape, fill, offset=(0, 0)):
+    """Fill a ``random_shape`` spec, shifted by ``-offset`` (a tile origin)."""
+    shape_type, x, y, size = shape
+    x -= offset[0]
+    y -= offset[1]
+
     if shape_type == "rectangle":
-        draw.rectangle([x, y, x + size, y + size], fill=color)
+        draw.rectangle([x, y, x + size, y + size], fill=fill)
     elif shape_type == "circle":
-        draw.ellipse([x, y, x + size, y + size], fill=color)
+        draw.ellipse([x, y, x + size, y + size], fill=fill)
     elif shape_type == "polygon":
         # Create a random triangle
         points = [
@@ -39,96 +81,429 @@ def draw_random_shape(draw, color, image_size):
             (x, y + size),
             (x + size, y + size)
         ]
-        draw.polygon(points, fill=color)
+        draw.polygon(points, fill=fill)
+
+def draw_random_shape(draw, color, image_size, rng=random, label_draw=None, label=None):
+    """Draw a random shape (rectangle, circle, or polygon) with the given color.
+
+    ``rng`` is any ``random.Random``-like source; it defaults to the global
+    ``random`` module.  When ``label_draw`` is given, the same shape is also
+    filled with ``label`` on that single-channel label raster.
+    """
+    shape = random_shape(image_size, rng)
+    draw_shape(draw, shape, color)
+    if label_draw is not None:
+        draw_shape(label_draw, shape, label)
+
+def _ordered_counts(labels):
+    """``{color_name: count}`` for palette indices, keyed in first-occurrence order."""
+    names = list(COLORS)
+    if not len(labels):
+        return {}
+    counts = np.bincount(labels, minlength=len(names))
+    present, first_seen = np.unique(labels, return_index=True)
+    order = present[np.argsort(first_seen)]
+    return {names[k]: int(counts[k]) for k in order}
 
 def calculate_color_areas(image):
-    """Calculate the area covered by each color in the image."""
-    color_areas = {}
-    width, height = image.size
+    """Calculate the area covered by each color in the image.
+
+    The image is read as a single array, every non-white pixel is mapped to
+    its nearest color in ``COLORS`` through the cached palette lookup table
+    and the assignments are counted with ``np.bincount``.  Keys are ordered
+    by first occurrence in row-major order so
+    ``max(color_areas, key=color_areas.get)`` breaks ties exactly as the
+    original per-pixel scan did.
+    """
+    return pixel_color_areas(np.asarray(image.convert("RGB")))
+
+def pixel_color_areas(pixels):
+    """``calculate_color_areas`` for an ``(H, W, 3)`` uint8 RGB array."""
+    keys = pack_rgb(pixels).ravel()
+
+    # Skip white background
+    keys = keys[keys != 0xFFFFFF]
+    return _ordered_counts(get_lut(COLORS)[keys])
+
+def label_map_areas(label_map):
+    """Calculate the area covered by each color from a label raster.
+
+    This is a direct count of label IDs with no color distance math.  White
+    shapes cannot be told apart from the background in the RGB image, so
+    they are skipped together with the background, exactly as
+    ``calculate_color_areas`` does; both functions return the same dict for
+    images drawn by ``render_image``.
+    """
+    labels = np.asarray(label_map).ravel()
+    labels = labels[(labels != BACKGROUND_LABEL) & (labels != COLOR_LABELS["white"])]
+    return _ordered_counts(labels.astype(np.intp) - 1)
+
+def image_seed(base_seed, index):
+    """Derive the seed of image ``index`` from the dataset seed.
+
+    The derivation only depends on its arguments, so every image can be
+    rendered independently and in any order.
+    """
+    digest = hashlib.sha256("{}:{}".format(base_seed, index).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def plan_image(seed, image_size=512, min_regions=3, max_regions=8):
+    """Choose the colors and shapes of one image without drawing anything.
+
+    Returns ``(selected_colors, shapes)`` where ``shapes`` lists
+    ``(color_name, shape)`` pairs in drawing order.
+    """
+    rng = random.Random(seed)
+    
+    # Select colors for this image
+    num_regions = rng.randint(min_regions, max_regions)
+    available_colors = list(COLORS.keys())
+    selected_colors = rng.sample(available_colors, min(num_regions, len(available_colors)))
     
-    for y in range(height):
-        for x in range(width):
-            pixel = image.getpixel((x, y))
-            # Skip white background
-            if pixel == (255, 255, 255):
-                continue
-                
-            # Find closest color name
-            closest_color = None
-            min_distance = float('inf')
-            
-            for color_name, color_rgb in COLORS.items():
-                distance = sum((a - b) ** 2 for a, b in zip(pixel, color_rgb))
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_color = color_name
-            
-            if closest_color:
-                color_areas[closest_color] = color_areas.get(closest_color, 0) + 1
+    # Ensure we have at least 2 colors
+    if len(selected_colors) < 2:
+        selected_colors.extend(rng.sample([c for c in available_colors if c not in selected_colors], 2 - len(selected_colors)))
     
-    return color_areas
+    # Regions with varying sizes to create dominance
+    shapes = []
+    for j, color_name in enumerate(selected_colors):
+        # Make one color dominant by drawing more/larger regions
+        if j == 0:  # First color gets more regions
+            num_shapes = rng.randint(3, 6)
+        else:
+            num_shapes = rng.randint(1, 3)
+        
+        for _ in range(num_shapes):
+            shapes.append((color_name, random_shape(image_size, rng)))
+
+    return selected_colors, shapes
+
+def render_image(seed, image_size=512, min_regions=3, max_regions=8):
+    """Render one image from its seed.
+
+    Returns ``(img, label_map, dominant_color)``.  The RGB image is what
+    agents see; ``label_map`` is an "L" raster drawn in the same pass with
+    ``COLOR_LABELS`` values, and the dominant color is counted from it.
+    """
+    return render_image_areas(seed, image_size, min_regions, max_regions)[:3]
+
+def render_image_areas(seed, image_size=512, min_regions=3, max_regions=8, timings=None):
+    """``render_image`` that also returns the ``label_map_areas`` counts it used.
+
+    ``timings`` (a dict) accumulates the "draw" and "count" stage seconds.
+    """
+    with stage_timer(timings, "draw"):
+        selected_colors, shapes = plan_image(seed, image_size, min_regions, max_regions)
+
+        # Create white background
+        img = Image.new("RGB", (image_size, image_size), (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        label_map = Image.new("L", (image_size, image_size), BACKGROUND_LABEL)
+        label_draw = ImageDraw.Draw(label_map)
+
+        for color_name, shape in shapes:
+            draw_shape(draw, shape, COLORS[color_name])
+            draw_shape(label_draw, shape, COLOR_LABELS[color_name])
+    
+    # Calculate actual dominant color
+    with stage_timer(timings, "count"):
+        color_areas = label_map_areas(label_map)
+    if color_areas:
+        dominant_color = max(color_areas, key=color_areas.get)
+    else:
+        dominant_color = selected_colors[0]  # Fallback
+
+    return img, label_map, dominant_color, color_areas
+
+def palette_image(label_map):
+    """Wrap a label raster as a "P" image whose palette is ``LABEL_PALETTE``.
+
+    It decodes to exactly the same RGB pixels as the rendered image.
+    """
+    img = Image.frombytes("P", label_map.size, label_map.tobytes())
+    img.putpalette([channel for rgb in LABEL_PALETTE for channel in rgb])
+    return img
+
+def save_png(path_or_file, img, label_map, png_mode="rgb", compress_level=None):
+    """Save a rendered image as an RGB or palette ("P") PNG.
+
+    ``compress_level`` is zlib's 0-9 (None keeps Pillow's default of 6).
+    """
+    if png_mode not in PNG_MODES:
+        raise ValueError("Unknown png_mode {!r}; expected one of {}".format(png_mode, PNG_MODES))
+    out = palette_image(label_map) if png_mode == "palette" else img
+    options = {"format": "PNG"}
+    if compress_level is not None:
+        options["compress_level"] = compress_level
+    out.save(path_or_file, **options)
+
+def replace_file(path, data):
+    """Write ``data`` to a new file that replaces ``path``.
+
+    Agent workspaces hardlink the input files read-only (see
+    workspaces.py), so inputs are never rewritten in place.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# One image job for _generate_image.  ``subdir`` is the shard directory
+# relative to ``input_dir`` ("" for the flat layout); ``pack`` is the base
+# path of a packed dataset to also write into, or None.
+ImageTask = namedtuple("ImageTask", "index seed input_dir subdir image_size min_regions max_regions "
+                                    "pack palettized png_mode compress_level")
+
+def _generate_image(task, timings=None):
+    """Process-pool entry point: render and save one image.
+
+    Returns ``(filename, dominant_color, sha256, color_areas)`` where
+    ``sha256`` is the hash of the PNG bytes written.  ``timings`` (a dict)
+    accumulates seconds per stage: draw, count, encode, hash, write, pack.
+    """
+    img, label_map, dominant_color, color_areas = render_image_areas(task.seed, task.image_size,
+                                                                     task.min_regions, task.max_regions,
+                                                                     timings)
+    filename = "image_{}.png".format(task.index)
+    with stage_timer(timings, "encode"):
+        buffer = io.BytesIO()
+        save_png(buffer, img, label_map, task.png_mode, task.compress_level)
+        data = buffer.getvalue()
+    with stage_timer(timings, "hash"):
+        sha256 = hashlib.sha256(data).hexdigest()
+    with stage_timer(timings, "write"):
+        replace_file(os.path.join(task.input_dir, task.subdir, filename), data)
+    if task.pack:
+        with stage_timer(timings, "pack"):
+            packed_dataset.write_image(task.pack, task.index - 1, label_map if task.palettized else img)
+    return filename, dominant_color, sha256, color_areas
+
+def _generate_image_timed(task):
+    """``_generate_image`` for a process pool, returning ``(result, stage timings)``."""
+    timings = {}
+    return _generate_image(task, timings), timings
+
+def iter_dataset(num_images, image_size=512, min_regions=3, max_regions=8, seed=0):
+    """Yield ``(filename, img, dominant_color)`` records one image at a time."""
+    for i in range(1, num_images + 1):
+        img, _, dominant_color = render_image(image_seed(seed, i), image_size, min_regions, max_regions)
+        yield "image_{}.png".format(i), img, dominant_color
+
+def shard_name(index, shard_size):
+    """Name of the subdirectory holding image ``index`` in a sharded dataset."""
+    return "shard_{:05d}".format((index - 1) // shard_size)
+
+def _imap_bounded(func, tasks, workers, window_per_worker=8):
+    """Yield ``(task, func(task))`` pairs in completion order.
+
+    At most ``workers * window_per_worker`` tasks are in flight, so neither
+    the task iterator nor the results are ever materialized in full.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield task, func(task)
+        return
+
+    window = workers * window_per_worker
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for task in tasks:
+            pending[executor.submit(func, task)] = task
+            if len(pending) >= window:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        for future in as_completed(pending):
+            yield pending[future], future.result()
 
 def generate_dataset(output_dir, num_images=15, image_size=512, 
-                    min_regions=3, max_regions=8):
-    """Generate a dataset of images with dominant colors."""
+                    min_regions=3, max_regions=8, seed=None, workers=1, pack=None,
+                    png_mode="rgb", compress_level=None, resume=False, timings=None):
+    """Generate a dataset of images with dominant colors.
+
+    Each image is rendered from ``image_seed(seed, i)``, so the output is
+    byte-identical for a given ``seed`` regardless of ``workers``.  When
+    ``seed`` is None one is drawn from the global ``random`` state.
+
+    ``pack`` ("rgb" or "palettized") additionally writes a memory-mapped
+    packed dataset to ``output_dir/images_packed`` (see packed_dataset).
+    ``png_mode`` and ``compress_level`` are passed to ``save_png``.
+
+    Every finished image is recorded in ``manifest.jsonl``.  With
+    ``resume=True`` images whose manifest entry is still valid (same seed
+    and parameters, file present with the recorded hash) are kept and only
+    missing, corrupt or outdated ones are rendered again; ``seed`` defaults
+    to the seed of the previous run.
+
+    Per-image color counts, runner-up colors and dominance margins are
+    written to ``color_areas.npz`` (see area_index).
+
+    ``timings`` (a dict) accumulates seconds per stage: the per-image
+    stages of ``_generate_image`` summed over workers, plus manifest,
+    area_index and json in this process.
+    """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     input_dir = os.path.join(output_dir, "input")
     if not os.path.exists(input_dir):
         os.makedirs(input_dir)
-    gt = {}
 
+    manifest_path = os.path.join(output_dir, dataset_manifest.MANIFEST_NAME)
+    previous = dataset_manifest.load_manifest(manifest_path) if resume else {}
+    if seed is None and previous:
+        seed = next(iter(previous.values()))["params"]["dataset_seed"]
+    if seed is None:
+        seed = random.getrandbits(32)
+    params = {
+        "dataset_seed": seed,
+        "image_size": image_size,
+        "min_regions": min_regions,
+        "max_regions": max_regions,
+        "png_mode": png_mode,
+        "compress_level": compress_level,
+    }
+
+    pack_path = None
+    palettized = pack == "palettized"
+    if pack:
+        pack_path = os.path.join(output_dir, PACKED_BASENAME)
+        packed_dataset.create_packed(pack_path, num_images, (image_size, image_size), palettized)
+
+    records = {}
+    tasks = []
     for i in range(1, num_images + 1):
-        # Create white background
-        img = Image.new("RGB", (image_size, image_size), (255, 255, 255))
-        draw = ImageDraw.Draw(img)
-        
-        # Select colors for this image
-        num_regions = random.randint(min_regions, max_regions)
-        available_colors = list(COLORS.keys())
-        selected_colors = random.sample(available_colors, min(num_regions, len(available_colors)))
-        
-        # Ensure we have at least 2 colors
-        if len(selected_colors) < 2:
-            selected_colors.extend(random.sample([c for c in available_colors if c not in selected_colors], 2 - len(selected_colors)))
-        
-        # Draw regions with varying sizes to create dominance
-        for j, color_name in enumerate(selected_colors):
-            color_rgb = COLORS[color_name]
-            # Make one color dominant by drawing more/larger regions
-            if j == 0:  # First color gets more regions
-                num_shapes = random.randint(3, 6)
-            else:
-                num_shapes = random.randint(1, 3)
-            
-            for _ in range(num_shapes):
-                draw_random_shape(draw, color_rgb, image_size)
-        
-        # Calculate actual dominant color
-        color_areas = calculate_color_areas(img)
-        if color_areas:
-            dominant_color = max(color_areas, key=color_areas.get)
-        else:
-            dominant_color = selected_colors[0]  # Fallback
-        
         filename = "image_{}.png".format(i)
-        img.save(os.path.join(input_dir, filename))
-        gt[filename] = dominant_color
+        record = previous.get(filename)
+        if dataset_manifest.is_valid(record, image_seed(seed, i), params, os.path.join(input_dir, filename)):
+            records[filename] = record
+            if pack_path:
+                packed_dataset.write_image(pack_path, i - 1, packed_dataset.pixels_from_png(
+                    os.path.join(input_dir, filename), palettized))
+        else:
+            tasks.append(ImageTask(i, image_seed(seed, i), input_dir, "", image_size, min_regions,
+                                   max_regions, pack_path, palettized, png_mode, compress_level))
+    if resume:
+        print("Resuming: {} images valid, {} to generate".format(len(records), len(tasks)))
+
+    generate = _generate_image if timings is None else _generate_image_timed
+    with open(manifest_path, "a" if resume else "w") as manifest:
+        if workers > 1 and tasks:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            chunksize = max(1, len(tasks) // (workers * 4))
+            results = executor.map(generate, tasks, chunksize=chunksize)
+        else:
+            executor = None
+            results = map(generate, tasks)
+        try:
+            for task, result in zip(tasks, results):
+                if timings is not None:
+                    result, image_timings = result
+                    for stage, seconds in image_timings.items():
+                        timings[stage] = timings.get(stage, 0.0) + seconds
+                filename, dominant_color, sha256, color_areas = result
+                with stage_timer(timings, "manifest"):
+                    dataset_manifest.append_record(manifest, filename, task.seed, params, sha256,
+                                                   dominant_color, color_areas)
+                records[filename] = {"filename": filename, "seed": task.seed, "params": params,
+                                     "sha256": sha256, "label": dominant_color, "areas": color_areas}
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    packed_dataset.close_writers()
+
+    # Compact the manifest to one record per image, in filename order
+    ordered = [records["image_{}.png".format(i)] for i in range(1, num_images + 1)]
+    with stage_timer(timings, "manifest"):
+        dataset_manifest.write_manifest(manifest_path, ordered)
+    gt = {record["filename"]: record["label"] for record in ordered}
+
+    with stage_timer(timings, "area_index"):
+        # Manifests written before area counts were recorded need a recount
+        for record in ordered:
+            if "areas" not in record:
+                with Image.open(os.path.join(input_dir, record["filename"])) as img:
+                    record["areas"] = calculate_color_areas(img)
+        area_index.write_area_index(os.path.join(output_dir, area_index.AREA_INDEX_NAME), COLORS,
+                                    {record["filename"]: area_index.area_summary(record["areas"])
+                                     for record in ordered})
 
-    # Write ground truth colors JSON
-    with open(os.path.join(output_dir, "ground_truth_colors.json"), "w") as f:
-        json.dump(gt, f, indent=2)
+    with stage_timer(timings, "json"):
+        # Write ground truth colors JSON
+        with open(os.path.join(output_dir, "ground_truth_colors.json"), "w") as f:
+            json.dump(gt, f, indent=2)
 
-    # Write targets.json for some agents
-    targets_path = os.path.join(output_dir, "input", "targets.json")
-    with open(targets_path, "w") as f:
-        json.dump(gt, f, indent=2)
+        # Write targets.json for some agents
+        targets_path = os.path.join(output_dir, "input", "targets.json")
+        replace_file(targets_path, json.dumps(gt, indent=2).encode())
 
-    print("Generated {} images with dominant colors:".format(num_images))
+    if pack_path:
+        shape = (num_images, image_size, image_size) if palettized else (num_images, image_size, image_size, 3)
+        packed_dataset.write_index(pack_path, gt, shape, LABEL_PALETTE if palettized else None)
+
+    print("Generated {} images with dominant colors (seed {}):".format(num_images, seed))
     for filename, color in gt.items():
         print("  {}: {}".format(filename, color))
 
 
+def generate_dataset_streaming(output_dir, num_images, image_size=512, min_regions=3,
+                               max_regions=8, seed=None, workers=1, shard_size=1000,
+                               progress_interval=5.0, png_mode="rgb", compress_level=None):
+    """Generate a large dataset with memory that does not grow with ``num_images``.
+
+    Images are written to ``input/shard_NNNNN/`` subdirectories of
+    ``shard_size`` images each, and every finished image is appended to
+    ``ground_truth_colors.jsonl`` as one ``{"filename", "path", "color"}``
+    record.  With ``workers > 1`` records are appended in completion order.
+    Progress and throughput are printed every ``progress_interval`` seconds.
+    Color counts are spooled to disk and compacted into ``color_areas.npz``
+    (in image order) at the end.
+    """
+    input_dir = os.path.join(output_dir, "input")
+    os.makedirs(input_dir, exist_ok=True)
+    if seed is None:
+        seed = random.getrandbits(32)
+
+    def tasks():
+        for i in range(1, num_images + 1):
+            subdir = shard_name(i, shard_size)
+            if (i - 1) % shard_size == 0:
+                os.makedirs(os.path.join(input_dir, subdir), exist_ok=True)
+            yield ImageTask(i, image_seed(seed, i), input_dir, subdir, image_size,
+                            min_regions, max_regions, None, False, png_mode, compress_level)
+
+    print("Generating {} images in shards of {} (seed {})".format(num_images, shard_size, seed))
+    gt_path = os.path.join(output_dir, "ground_truth_colors.jsonl")
+    index_path = os.path.join(output_dir, area_index.AREA_INDEX_NAME)
+    areas_path = index_path + ".jsonl"
+    start_time = last_report = time.time()
+    done = 0
+    with open(gt_path, "w") as gt_file, open(areas_path, "w") as areas_file:
+        for task, (filename, dominant_color, _, color_areas) in _imap_bounded(_generate_image, tasks(), workers):
+            record = {
+                "filename": filename,
+                "path": "{}/{}".format(task.subdir, filename),
+                "color": dominant_color,
+            }
+            gt_file.write(json.dumps(record) + "\n")
+            area_index.append_summary(areas_file, task.index - 1, filename, area_index.area_summary(color_areas))
+            done += 1
+
+            now = time.time()
+            if now - last_report >= progress_interval:
+                gt_file.flush()
+                print("  {}/{} images ({:.1f} images/s)".format(done, num_images, done / (now - start_time)))
+                last_report = now
+
+    area_index.compact_jsonl(areas_path, index_path, COLORS, num_images)
+    os.remove(areas_path)
+
+    elapsed = time.time() - start_time
+    print("Generated {} images in {:.1f}s ({:.1f} images/s)".format(
+        done, elapsed, done / elapsed if elapsed > 0 else 0.0))
+    print("Ground truth: {}".format(gt_path))
+    return done
+
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
@@ -136,5 +511,31 @@ if __name__ == "__main__":
     parser.add_argument("--n", type=int, default=15, help="number of images")
     parser.add_argument("--min_regions", type=int, default=3)
     parser.add_argument("--max_regions", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=None, help="dataset seed (random if omitted)")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--stream", action="store_true",
+                        help="sharded output with JSONL ground truth for very large datasets")
+    parser.add_argument("--shard_size", type=int, default=1000, help="images per shard in --stream mode")
+    parser.add_argument("--pack", choices=["rgb", "palettized"], default=None,
+                        help="also write a memory-mapped packed dataset")
+    parser.add_argument("--png_mode", choices=PNG_MODES, default="rgb",
+                        help="save RGB PNGs or palette PNGs using the COLORS palette")
+    parser.add_argument("--resume", action="store_true",
+                        help="keep images that are still valid according to manifest.jsonl")
+    parser.add_argument("--compress_level", type=int, choices=range(10), default=None, metavar="0-9",
+                        help="zlib compression level for PNGs (default 6)")
     args = parser.parse_args()
-    generate_dataset(args.out, args.n, min_regions=args.min_regions, max_regions=args.max_regions)
+    if args.stream and args.pack:
+        parser.error("--pack is not supported with --stream")
+    if args.stream and args.resume:
+        parser.error("--resume is not supported with --stream")
+    if args.stream:
+        generate_dataset_streaming(args.out, args.n, min_regions=args.min_regions,
+                                   max_regions=args.max_regions, seed=args.seed,
+                                   workers=args.workers, shard_size=args.shard_size,
+                                   png_mode=args.png_mode, compress_level=args.compress_level)
+    else:
+        generate_dataset(args.out, args.n, min_regions=args.min_regions, max_regions=args.max_regions,
+                         seed=args.seed, workers=args.workers, pack=args.pack,
+                         png_mode=args.png_mode, compress_level=args.compress_level,
+                         resume=args.resume)
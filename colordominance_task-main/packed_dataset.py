@@ -0,0 +1,193 @@
+"""
+Packed, memory-mapped container for Color Dominance datasets.
+
+A packed dataset is two files sharing a base path:
+
+- ``<base>.npy``: one uint8 array of shape ``(N, H, W, 3)`` (RGB) or
+  ``(N, H, W)`` (palettized, values index into the stored palette)
+- ``<base>.index.json``: format, shape, palette and a ``filename ->
+  {"offset", "label"}`` mapping
+
+Readers memory-map the array, so fetching an image is a zero-copy view
+instead of a PNG open and decode.
+
+Usage: python packed_dataset.py <input_dir> <base_path> [--palettized]
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+from PIL import Image
+
+from palette_lut import classify_pixels
+
+DATA_SUFFIX = ".npy"
+INDEX_SUFFIX = ".index.json"
+
+# Memmaps opened for writing in this process, keyed by data path
+_WRITERS = {}
+
+
+def natural_key(filename):
+    """Sort key that puts image_2.png before image_10.png."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", filename)]
+
+
+def create_packed(base_path, num_images, size, palettized=False):
+    """Create the data file for ``num_images`` images of ``size`` (width, height)."""
+    shape = (num_images, size[1], size[0])
+    if not palettized:
+        shape += (3,)
+    os.makedirs(os.path.dirname(os.path.abspath(base_path)), exist_ok=True)
+    array = np.lib.format.open_memmap(base_path + DATA_SUFFIX, mode="w+", dtype=np.uint8, shape=shape)
+    array.flush()
+    return array
+
+
+def write_image(base_path, offset, pixels):
+    """Write one image into slot ``offset`` of an existing data file.
+
+    Safe to call from worker processes: each process maps the file once and
+    writes only its own slots.
+    """
+    data_path = base_path + DATA_SUFFIX
+    array = _WRITERS.get(data_path)
+    if array is None:
+        array = np.load(data_path, mmap_mode="r+")
+        _WRITERS[data_path] = array
+    array[offset] = np.asarray(pixels, dtype=np.uint8)
+
+
+def close_writers():
+    """Flush and drop every memmap opened by ``write_image`` in this process."""
+    for array in _WRITERS.values():
+        array.flush()
+    _WRITERS.clear()
+
+
+def write_index(base_path, labels, shape, palette=None):
+    """Write the index for ``labels``, a ``{filename: label}`` dict in offset order."""
+    index = {
+        "format": "palettized" if palette is not None else "rgb",
+        "shape": [int(n) for n in shape],
+        "palette": [[int(c) for c in rgb] for rgb in palette] if palette is not None else None,
+        "entries": {
+            filename: {"offset": offset, "label": label}
+            for offset, (filename, label) in enumerate(labels.items())
+        },
+    }
+    with open(base_path + INDEX_SUFFIX, "w") as f:
+        json.dump(index, f)
+
+
+class PackedDataset:
+    """Read-only view of a packed dataset."""
+
+    def __init__(self, base_path):
+        with open(base_path + INDEX_SUFFIX, "r") as f:
+            index = json.load(f)
+        self.format = index["format"]
+        self.entries = index["entries"]
+        self.palette = np.array(index["palette"], dtype=np.uint8) if index["palette"] else None
+        self.images = np.load(base_path + DATA_SUFFIX, mmap_mode="r")
+        if list(self.images.shape) != index["shape"]:
+            raise ValueError("Packed data shape {} does not match index shape {}".format(
+                self.images.shape, index["shape"]))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __contains__(self, filename):
+        return filename in self.entries
+
+    def __getitem__(self, filename):
+        """Zero-copy view of the stored pixels (palette indices if palettized)."""
+        return self.images[self.entries[filename]["offset"]]
+
+    def label(self, filename):
+        return self.entries[filename]["label"]
+
+    def labels(self):
+        return {filename: entry["label"] for filename, entry in self.entries.items()}
+
+    def rgb(self, filename):
+        """``(H, W, 3)`` RGB pixels; a view unless the dataset is palettized."""
+        pixels = self[filename]
+        return self.palette[pixels] if self.palette is not None else pixels
+
+    def image(self, filename):
+        return Image.fromarray(np.ascontiguousarray(self.rgb(filename)), "RGB")
+
+
+def pixels_from_png(path, palettized=False):
+    """Decode a generated PNG into the array stored in a packed dataset.
+
+    Palettized arrays hold ``LABEL_PALETTE`` indices, like the generator's
+    label maps; images with pixels that are not exact palette colors are
+    refused, since that would be lossy.
+    """
+    from generate_inputs import COLORS, LABEL_PALETTE
+
+    with Image.open(path) as img:
+        pixels = np.asarray(img.convert("RGB"))
+    if not palettized:
+        return pixels
+    # Shift past the background entry; white pixels get the white label
+    indices = classify_pixels(pixels, COLORS) + 1
+    if not np.array_equal(np.asarray(LABEL_PALETTE, dtype=np.uint8)[indices], pixels):
+        raise ValueError("{} has colors outside the palette; pack it as RGB".format(path))
+    return indices
+
+
+def pack_directory(input_dir, base_path, palettized=False, labels=None):
+    """Pack every PNG in ``input_dir`` into a packed dataset at ``base_path``.
+
+    Labels default to ``input_dir/targets.json`` when present.  See
+    ``pixels_from_png`` for how palettized images are stored.
+    """
+    from generate_inputs import LABEL_PALETTE
+
+    filenames = sorted((f for f in os.listdir(input_dir) if f.lower().endswith(".png")), key=natural_key)
+    if not filenames:
+        raise ValueError("No PNG images found in {}".format(input_dir))
+    if labels is None:
+        targets_path = os.path.join(input_dir, "targets.json")
+        if os.path.exists(targets_path):
+            with open(targets_path, "r") as f:
+                labels = json.load(f)
+        else:
+            labels = {}
+
+    with Image.open(os.path.join(input_dir, filenames[0])) as first:
+        size = first.size
+    palette = np.array(LABEL_PALETTE, dtype=np.uint8) if palettized else None
+    array = create_packed(base_path, len(filenames), size, palettized)
+    shape = array.shape
+
+    for offset, filename in enumerate(filenames):
+        pixels = pixels_from_png(os.path.join(input_dir, filename), palettized)
+        if pixels.shape[:2] != shape[1:3]:
+            raise ValueError("{} is {}x{}, expected {}x{}".format(
+                filename, pixels.shape[1], pixels.shape[0], *size))
+        array[offset] = pixels
+
+    array.flush()
+    del array
+    write_index(base_path, {f: labels.get(f) for f in filenames}, shape, palette)
+    return len(filenames)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Pack an input/ directory into a memory-mapped dataset")
+    parser.add_argument("input_dir")
+    parser.add_argument("base_path", help="output path without extension")
+    parser.add_argument("--palettized", action="store_true", help="store palette indices instead of RGB")
+    args = parser.parse_args()
+    count = pack_directory(args.input_dir, args.base_path, palettized=args.palettized)
+    print("Packed {} images into {}{}".format(count, args.base_path, DATA_SUFFIX))
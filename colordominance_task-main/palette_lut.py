@@ -0,0 +1,106 @@
+"""
+RGB -> palette index lookup tables shared by the generator and evaluator.
+
+Nearest-color classification only depends on the RGB triple, so the answer
+for every 24-bit color is computed once per palette and stored as a flat
+uint8 table.  Tables are keyed by a hash of the palette and persisted in
+``CACHE_DIR``; changing the palette produces a new key and therefore a
+fresh table.  Classifying an image is then a single indexed gather.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+CACHE_DIR = os.environ.get(
+    "COLORDOMINANCE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "colordominance"),
+)
+
+LUT_SIZE = 1 << 24
+
+# Tables already loaded in this process, keyed by palette hash
+_LOADED = {}
+
+
+def palette_hash(colors):
+    """Stable short hash of an ordered ``{name: (r, g, b)}`` palette."""
+    payload = json.dumps([[name, list(rgb)] for name, rgb in colors.items()])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_lut(colors):
+    """Compute the nearest palette index for every 24-bit RGB value.
+
+    Ties go to the earliest palette entry, matching a strict ``<`` scan
+    over ``colors`` in insertion order.
+    """
+    palette = np.array(list(colors.values()), dtype=np.int32)
+    if len(palette) > 256:
+        raise ValueError("Palette has {} colors; at most 256 are supported".format(len(palette)))
+
+    gb = np.arange(1 << 16, dtype=np.int32)
+    g = (gb >> 8)[:, None]
+    b = (gb & 0xFF)[:, None]
+    partial = (g - palette[None, :, 1]) ** 2 + (b - palette[None, :, 2]) ** 2
+
+    lut = np.empty(LUT_SIZE, dtype=np.uint8)
+    for r in range(256):
+        distances = partial + (r - palette[None, :, 0]) ** 2
+        lut[r << 16:(r + 1) << 16] = distances.argmin(axis=1)
+    return lut
+
+
+def lut_path(colors, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, "palette_lut_{}.npy".format(palette_hash(colors)))
+
+
+def get_lut(colors, cache_dir=None):
+    """Return the lookup table for ``colors``, building and caching it if needed."""
+    key = (palette_hash(colors), cache_dir or CACHE_DIR)
+    lut = _LOADED.get(key)
+    if lut is not None:
+        return lut
+
+    path = lut_path(colors, cache_dir)
+    try:
+        lut = np.load(path, mmap_mode="r")
+        if lut.shape != (LUT_SIZE,) or lut.dtype != np.uint8:
+            lut = None
+    except (OSError, ValueError):
+        lut = None
+
+    if lut is None:
+        lut = build_lut(colors)
+        _save_atomic(path, lut)
+
+    _LOADED[key] = lut
+    return lut
+
+
+def _save_atomic(path, array):
+    """Write ``array`` to ``path`` so concurrent readers never see a partial file."""
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    except OSError:
+        # An unwritable cache only costs a rebuild in the next process
+        pass
+
+
+def pack_rgb(pixels):
+    """Pack a ``(..., 3)`` uint8 array into 24-bit integer keys."""
+    pixels = np.asarray(pixels, dtype=np.uint32)
+    return (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
+
+
+def classify_pixels(pixels, colors, cache_dir=None):
+    """Map a ``(..., 3)`` RGB array to nearest palette indices."""
+    return get_lut(colors, cache_dir)[pack_rgb(pixels)]
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Reference dominant-color solver.
+
+Scans a dataset, counts every image's pixels over the ``COLORS`` palette
+with the vectorized lookup-table histogram, and writes ``solution.json``
+in the format ``ColorDominanceEvaluator`` expects.  This sets the accuracy
+and throughput ceiling that agent runs are compared against.
+
+Supported dataset layouts:
+- a flat ``input/`` directory of PNGs
+- a sharded ``input/`` directory (``shard_NNNNN/`` subdirectories)
+- a packed dataset, given by its base path (see packed_dataset)
+
+Usage: python reference_solver.py <input_dir_or_packed_base> [--out solution.json] [--workers N]
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import packed_dataset
+from generate_inputs import calculate_color_areas, label_map_areas, pixel_color_areas
+
+# Prediction for images without any non-white pixel
+BLANK_PREDICTION = "white"
+
+# Packed datasets opened in this process, keyed by base path
+_PACKED = {}
+
+
+def list_images(source):
+    """Return ``(kind, [(filename, locator), ...])`` for a dataset source.
+
+    ``kind`` is "packed" or "png"; a locator is the path of a PNG relative
+    to ``source`` or, for packed datasets, the filename itself.
+    """
+    if os.path.exists(source + packed_dataset.INDEX_SUFFIX):
+        return "packed", [(f, f) for f in packed_dataset.PackedDataset(source)]
+
+    images = []
+    for dirpath, dirnames, filenames in os.walk(source):
+        dirnames.sort()
+        for filename in filenames:
+            if filename.lower().endswith(".png"):
+                images.append((filename, os.path.relpath(os.path.join(dirpath, filename), source)))
+    images.sort(key=lambda item: packed_dataset.natural_key(item[0]))
+    return "png", images
+
+
+def dominant_color(color_areas):
+    if not color_areas:
+        return BLANK_PREDICTION
+    return max(color_areas, key=color_areas.get)
+
+
+def _solve_chunk(task):
+    """Process-pool entry point: predict a list of ``(filename, locator)``."""
+    kind, source, items = task
+    predictions = []
+    if kind == "packed":
+        dataset = _PACKED.get(source)
+        if dataset is None:
+            dataset = _PACKED[source] = packed_dataset.PackedDataset(source)
+        for filename, _ in items:
+            if dataset.palette is not None:
+                areas = label_map_areas(dataset[filename])
+            else:
+                areas = pixel_color_areas(dataset[filename])
+            predictions.append((filename, dominant_color(areas)))
+    else:
+        for filename, relpath in items:
+            with Image.open(os.path.join(source, relpath)) as img:
+                predictions.append((filename, dominant_color(calculate_color_areas(img))))
+    return predictions
+
+
+def solve(source, workers=1, chunk_size=64):
+    """Predict the dominant color of every image in ``source``, in filename order."""
+    kind, images = list_images(source)
+    tasks = [(kind, source, images[i:i + chunk_size]) for i in range(0, len(images), chunk_size)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(_solve_chunk, tasks))
+    else:
+        chunks = [_solve_chunk(task) for task in tasks]
+    return {filename: color for chunk in chunks for filename, color in chunk}
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Write a reference solution.json for a dataset")
+    parser.add_argument("source", help="input/ directory (flat or sharded) or packed dataset base path")
+    parser.add_argument("--out", default="solution.json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    start_time = time.time()
+    predictions = solve(args.source, args.workers)
+    elapsed = time.time() - start_time
+
+    with open(args.out, "w") as f:
+        json.dump({"predictions": predictions}, f, indent=2)
+
+    rate = len(predictions) / elapsed if elapsed > 0 else 0.0
+    print(f"Solved {len(predictions)} images in {elapsed:.2f}s ({rate:.1f} images/s) with {args.workers} workers")
+    print(f"Solution written to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Scoring core shared by every Color Dominance evaluation entry point.
+
+``ColorDominanceEvaluator``, ``evaluate_solution.py``, ``test_agents.py``
+and ``simple_test.py`` all score through this module, so label
+normalization (``.lower().strip()``) and the metrics are the same
+everywhere.
+
+Two APIs:
+
+- batched: ``score(predictions, ground_truth)`` for a prediction dict
+- streaming: ``Scorer(ground_truth)``, fed one prediction at a time with
+  ``add`` (or a whole file with ``add_file``), then ``metrics()``.  Memory
+  is bounded by the ground truth, not by the number of predictions.
+
+Color names are interned to small integer IDs and each ground-truth image
+gets a slot in an aligned integer array, so the confusion matrix is one
+``bincount`` over ``true_id * n_columns + pred_id``.
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Confusion matrix column for images without a prediction
+MISSING_LABEL = "<missing>"
+
+EMPTY_METRICS = {"accuracy": 0.0, "total_images": 0, "correct_predictions": 0, "missing_predictions": 0}
+
+
+def normalize_label(value):
+    return value.lower().strip()
+
+
+def normalize_ground_truth(data):
+    return {filename: normalize_label(color) for filename, color in data.items()}
+
+
+def normalize_predictions(predictions):
+    """Normalized copy of ``{filename: color}``, dropping non-string values."""
+    return {filename: normalize_label(value) for filename, value in predictions.items()
+            if isinstance(value, str)}
+
+
+def read_ground_truth(path):
+    with open(path, "r") as f:
+        return normalize_ground_truth(json.load(f))
+
+
+def read_predictions_json(path):
+    """Normalized predictions of a ``{"predictions": {...}}`` solution file."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    return normalize_predictions(data.get("predictions", {}))
+
+
+def iter_predictions_jsonl(lines, name="solution.jsonl"):
+    """Yield ``(filename, color)`` from ``{"filename", "color"}`` JSON lines.
+
+    Blank lines are skipped and ``color`` is returned as written;
+    malformed lines raise ValueError naming ``name`` and the line number.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"{name} line {line_number}: {e}") from None
+        yield record.get("filename"), record.get("color")
+
+
+class Scorer:
+    """Streaming scorer for one ground truth.
+
+    ``add`` ignores images outside the ground truth and non-string colors;
+    a later prediction for the same image replaces the earlier one.
+    """
+
+    def __init__(self, ground_truth):
+        self.filenames = list(ground_truth)
+        self.rows = {filename: row for row, filename in enumerate(self.filenames)}
+        self.label_ids = {}
+        self.true_ids = np.fromiter(
+            (self._intern(normalize_label(color)) for color in ground_truth.values()),
+            dtype=np.int64, count=len(self.filenames))
+        self.num_true_labels = len(self.label_ids)
+        self.pred_ids = np.full(len(self.filenames), -1, dtype=np.int64)
+
+    def _intern(self, label):
+        return self.label_ids.setdefault(label, len(self.label_ids))
+
+    def add(self, filename, color):
+        row = self.rows.get(filename)
+        if row is not None and isinstance(color, str):
+            self.pred_ids[row] = self._intern(normalize_label(color))
+
+    def add_many(self, items):
+        for filename, color in items:
+            self.add(filename, color)
+
+    def add_file(self, path):
+        """Add every prediction in a .json or (streamed) .jsonl solution file."""
+        if path.endswith(".jsonl"):
+            with open(path, "r") as f:
+                self.add_many(iter_predictions_jsonl(f, os.path.basename(path)))
+        else:
+            with open(path, "r") as f:
+                data = json.load(f)
+            self.add_many(data.get("predictions", {}).items())
+
+    @property
+    def num_predictions(self):
+        return int((self.pred_ids >= 0).sum())
+
+    def outcomes(self):
+        """Yield ``(filename, true_color, predicted_color_or_None)`` in ground-truth order."""
+        labels = list(self.label_ids)
+        for filename, true_id, pred_id in zip(self.filenames, self.true_ids, self.pred_ids):
+            yield filename, labels[true_id], labels[pred_id] if pred_id >= 0 else None
+
+    def metrics(self):
+        """Accuracy plus a confusion matrix and per-color precision/recall.
+
+        Confusion matrix columns are the interned colors followed by
+        ``MISSING_LABEL``; rows are the ground-truth colors.
+        """
+        if not self.filenames:
+            return dict(EMPTY_METRICS)
+
+        num_true_labels = self.num_true_labels
+        missing_id = len(self.label_ids)
+        num_columns = missing_id + 1
+        pred_ids = np.where(self.pred_ids < 0, missing_id, self.pred_ids)
+        confusion = np.bincount(self.true_ids * num_columns + pred_ids,
+                                minlength=num_true_labels * num_columns).reshape(num_true_labels, num_columns)
+
+        total = len(self.filenames)
+        correct = int(np.trace(confusion[:, :num_true_labels]))
+        missing = int(confusion[:, missing_id].sum())
+        labels = list(self.label_ids)
+
+        # Per-color metrics over every color that was expected or predicted
+        support = np.zeros(missing_id, dtype=np.int64)
+        support[:num_true_labels] = confusion.sum(axis=1)
+        predicted = confusion[:, :missing_id].sum(axis=0)
+        true_positives = np.zeros(missing_id, dtype=np.int64)
+        true_positives[:num_true_labels] = np.diag(confusion[:, :num_true_labels])
+        precision = np.divide(true_positives, predicted, out=np.zeros(missing_id), where=predicted > 0)
+        recall = np.divide(true_positives, support, out=np.zeros(missing_id), where=support > 0)
+        per_color = {
+            label: {
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "support": int(support[i]),
+                "predicted": int(predicted[i]),
+            }
+            for i, label in enumerate(labels)
+        }
+
+        return {
+            "accuracy": correct / total if total > 0 else 0.0,
+            "total_images": float(total),
+            "correct_predictions": float(correct),
+            "missing_predictions": float(missing),
+            "wrong_predictions": float(total - correct - missing),
+            "macro_precision": float(precision[:num_true_labels].mean()),
+            "macro_recall": float(recall[:num_true_labels].mean()),
+            "per_color": per_color,
+            "confusion_matrix": {
+                "labels": labels[:num_true_labels],
+                "columns": labels + [MISSING_LABEL],
+                "counts": confusion.tolist(),
+            },
+        }
+
+
+def score(predictions, ground_truth):
+    """Batched API: metrics for a ``{filename: color}`` prediction dict."""
+    scorer = Scorer(ground_truth)
+    scorer.add_many(predictions.items())
+    return scorer.metrics()
+
+
+def score_file(solution_path, ground_truth):
+    """Metrics for a .json or .jsonl solution file, streamed into a ``Scorer``."""
+    scorer = Scorer(ground_truth)
+    scorer.add_file(solution_path)
+    return scorer.metrics()
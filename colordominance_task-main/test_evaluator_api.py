@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import types
+from contextlib import contextmanager
+
+# Add the current directory to the path so we can import the evaluator
+TASK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TASK_DIR)
+
+
+# Mock the benchmark imports when the full framework is not installed
+class MockBaseEvaluator:
+    def print_task_info(self):
+        pass
+
+
+class MockEvaluationResult:
+    def __init__(self, task_id, agent_id, timestamp, metrics, success, execution_time, error_message):
+        self.task_id = task_id
+        self.agent_id = agent_id
+        self.timestamp = timestamp
+        self.metrics = metrics
+        self.success = success
+        self.execution_time = execution_time
+        self.error_message = error_message
+
+
+try:
+    import benchmark.core.base_evaluator  # noqa: F401
+except ImportError:
+    for name in ("benchmark", "benchmark.core", "benchmark.core.base_evaluator", "benchmark.core.result_types"):
+        sys.modules[name] = types.ModuleType(name)
+    sys.modules["benchmark.core.base_evaluator"].BaseEvaluator = MockBaseEvaluator
+    sys.modules["benchmark.core.result_types"].EvaluationResult = MockEvaluationResult
+
+import eval_client
+import eval_server
+import evaluator
+
+load_ground_truth = evaluator.ColorDominanceEvaluator._load_ground_truth_json
+
+
+def write_json(path, data, mtime_ns=None):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_ground_truth_cache_hits_and_misses():
+    evaluator.clear_ground_truth_cache()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_json(os.path.join(tmp, "gt.json"), {"a.png": " Red"})
+        first = load_ground_truth(path)
+        assert first == {"a.png": "red"}
+        assert load_ground_truth(path) is first
+        info = evaluator.ground_truth_cache_info()
+        assert (info["hits"], info["misses"], info["size"]) == (1, 1, 1)
+
+
+def test_ground_truth_cache_invalidates_changed_file():
+    evaluator.clear_ground_truth_cache()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_json(os.path.join(tmp, "gt.json"), {"a.png": "red"}, mtime_ns=1_000_000_000)
+        assert load_ground_truth(path) == {"a.png": "red"}
+
+        # Same size, new mtime
+        write_json(path, {"a.png": "tan"}, mtime_ns=2_000_000_000)
+        assert load_ground_truth(path) == {"a.png": "tan"}
+        # Same mtime, new size
+        write_json(path, {"a.png": "blue"}, mtime_ns=2_000_000_000)
+        assert load_ground_truth(path) == {"a.png": "blue"}
+
+        info = evaluator.ground_truth_cache_info()
+        assert (info["hits"], info["misses"], info["evictions"]) == (0, 3, 0)
+        # Stale entries of the same file are replaced, not kept around
+        assert info["size"] == 1
+
+
+def test_ground_truth_cache_evicts_least_recently_used():
+    evaluator.clear_ground_truth_cache()
+    size = evaluator.GROUND_TRUTH_CACHE_SIZE
+    evaluator.GROUND_TRUTH_CACHE_SIZE = 2
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            a, b, c = (write_json(os.path.join(tmp, name + ".json"), {name: "red"}) for name in "abc")
+            load_ground_truth(a)
+            load_ground_truth(b)
+            load_ground_truth(a)  # a is now more recent than b
+            load_ground_truth(c)  # evicts b
+            info = evaluator.ground_truth_cache_info()
+            assert (info["size"], info["evictions"]) == (2, 1)
+
+            load_ground_truth(a)
+            load_ground_truth(c)
+            assert evaluator.ground_truth_cache_info()["hits"] == 3
+            load_ground_truth(b)
+            assert evaluator.ground_truth_cache_info()["misses"] == 4
+    finally:
+        evaluator.GROUND_TRUTH_CACHE_SIZE = size
+        evaluator.clear_ground_truth_cache()
+
+
+with open(os.path.join(TASK_DIR, "config.json"), "r") as f:
+    CONFIG = json.load(f)
+
+GROUND_TRUTH = {"a.png": "red", "b.png": "blue", "c.png": "green"}
+
+
+class RecordingHooks(evaluator.EvaluationHooks):
+    def __init__(self):
+        self.phases = []
+        self.results = []
+
+    def on_phase(self, phase, seconds, num_bytes):
+        self.phases.append(phase)
+
+    def on_result(self, result):
+        self.results.append(result)
+
+
+def make_solution_folders(tmp):
+    """Folders with a perfect .json, no solution, a partial .jsonl and a malformed .jsonl."""
+    folders = [os.path.join(tmp, name) for name in ("perfect", "missing", "partial", "broken")]
+    for folder in folders:
+        os.makedirs(folder)
+    write_json(os.path.join(folders[0], "solution.json"), {"predictions": {"a.png": "Red", "b.png": "blue",
+                                                                           "c.png": "green"}})
+    with open(os.path.join(folders[2], "solution.jsonl"), "w") as f:
+        f.write(json.dumps({"filename": "a.png", "color": "red"}) + "\n")
+        f.write(json.dumps({"filename": "b.png", "color": "green"}) + "\n")
+    with open(os.path.join(folders[3], "solution.jsonl"), "w") as f:
+        f.write("{not json\n")
+    return folders
+
+
+def comparable(result):
+    metrics = {k: v for k, v in result.metrics.items() if k not in ("phase_seconds", "bytes_read")}
+    return result.success, result.error_message, metrics
+
+
+def test_evaluate_many_keeps_order_and_matches_serial_path():
+    with tempfile.TemporaryDirectory() as tmp:
+        folders = make_solution_folders(tmp)
+        serial = evaluator.ColorDominanceEvaluator(CONFIG).evaluate_many(folders, GROUND_TRUTH, max_workers=1)
+        pooled = evaluator.ColorDominanceEvaluator(CONFIG).evaluate_many(folders, GROUND_TRUTH, max_workers=2)
+
+        assert [comparable(r) for r in serial] == [comparable(r) for r in pooled]
+        assert [r.metrics["accuracy"] for r in serial] == [1.0, 0.0, 1 / 3, 0.0]
+        assert serial[1].error_message == "Solution file solution.json not found"
+        assert serial[2].metrics["missing_predictions"] == 1
+        assert serial[3].error_message.startswith("Evaluation error: solution.jsonl line 1:")
+
+        # Batch results match one-by-one evaluation
+        single = evaluator.ColorDominanceEvaluator(CONFIG)
+        assert [comparable(single.evaluate(folder, GROUND_TRUTH)) for folder in folders] == \
+            [comparable(r) for r in serial]
+
+
+def test_jsonl_solution_times_reading_and_parsing():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = make_solution_folders(tmp)[2]
+        metrics = evaluator.ColorDominanceEvaluator(CONFIG).evaluate(folder, GROUND_TRUTH).metrics
+        assert metrics["phase_seconds"]["read_solution"] > 0
+        assert metrics["phase_seconds"]["parse_solution"] > 0
+        assert metrics["bytes_read"]["read_solution"] == os.path.getsize(os.path.join(folder, "solution.jsonl"))
+
+
+def test_evaluate_many_notifies_hooks():
+    with tempfile.TemporaryDirectory() as tmp:
+        folders = make_solution_folders(tmp)
+        hooks = RecordingHooks()
+        results = evaluator.ColorDominanceEvaluator(CONFIG, hooks=[hooks]).evaluate_many(
+            folders, GROUND_TRUTH, max_workers=2)
+        assert hooks.results == results
+        assert hooks.phases.count("score") == 2
+        assert "parse_solution" in hooks.phases
+
+
+@contextmanager
+def running_server(ground_truth_path):
+    """Serve on an ephemeral port in a background thread and point eval_client at it."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    async def start():
+        state["server"] = eval_server.EvaluationServer(CONFIG, ground_truth_path, workers=1)
+        state["listener"] = await asyncio.start_server(state["server"].handle, "127.0.0.1", 0)
+        started.set()
+
+    thread = threading.Thread(target=lambda: (loop.run_until_complete(start()), loop.run_forever()), daemon=True)
+    thread.start()
+    started.wait(10)
+    address = os.environ.get("COLORDOMINANCE_EVAL_SERVER")
+    os.environ["COLORDOMINANCE_EVAL_SERVER"] = "127.0.0.1:{}".format(state["listener"].sockets[0].getsockname()[1])
+    try:
+        yield state["server"]
+    finally:
+        if address is None:
+            del os.environ["COLORDOMINANCE_EVAL_SERVER"]
+        else:
+            os.environ["COLORDOMINANCE_EVAL_SERVER"] = address
+        loop.call_soon_threadsafe(state["listener"].close)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(10)
+        state["server"].close()
+        loop.close()
+
+
+def test_eval_server_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        gt_path = write_json(os.path.join(tmp, "gt.json"), GROUND_TRUTH)
+        folders = make_solution_folders(tmp)
+        with running_server(gt_path):
+            assert eval_client.is_running()
+            assert eval_client.health()["ground_truth"] == os.path.abspath(gt_path)
+
+            result = eval_client.evaluate(solution_folder=folders[0])
+            assert result["success"] and result["metrics"]["accuracy"] == 1.0
+            assert "score" in result["metrics"]["phase_seconds"]
+            result = eval_client.evaluate(solution_path=os.path.join(folders[2], "solution.jsonl"))
+            assert result["metrics"]["correct_predictions"] == 1
+            result = eval_client.evaluate(predictions={"a.png": "RED"}, ground_truth=gt_path)
+            assert result["metrics"]["accuracy"] == 1 / 3
+            result = eval_client.evaluate(solution_folder=folders[1])
+            assert not result["success"] and result["error_message"] == "Solution file solution.json not found"
+
+            for payload in ({"predictions": {}, "ground_truth": 5}, {"solution_path": 5},
+                            {"solution_folder": ["x"]}, {"predictions": []}, {}):
+                try:
+                    eval_client._request("/evaluate", payload)
+                except eval_client.EvaluationServerError as e:
+                    assert str(e).startswith("400 /evaluate:"), e
+                else:
+                    raise AssertionError("accepted {}".format(payload))
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            print("Running {}...".format(name))
+            func()
+    print("\nEvaluator API tests completed successfully!")
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import random
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+
+import numpy as np
+from PIL import Image
+
+# Add the current directory to the path so we can import the generator
+TASK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TASK_DIR)
+
+import area_index
+import packed_dataset
+import palette_lut
+import reference_solver
+import tiled_render
+import verify_dataset
+from generate_inputs import (COLORS, calculate_color_areas, generate_dataset,
+                             generate_dataset_streaming, image_seed, iter_dataset, label_map_areas,
+                             plan_image, render_image, render_image_areas)
+
+
+def reference_color_areas(image):
+    """Original per-pixel implementation of calculate_color_areas."""
+    color_areas = {}
+    width, height = image.size
+    for y in range(height):
+        for x in range(width):
+            pixel = image.getpixel((x, y))
+            if pixel == (255, 255, 255):
+                continue
+            closest_color = None
+            min_distance = float('inf')
+            for color_name, color_rgb in COLORS.items():
+                distance = sum((a - b) ** 2 for a, b in zip(pixel, color_rgb))
+                if distance < min_distance:
+                    min_distance = distance
+                    closest_color = color_name
+            if closest_color:
+                color_areas[closest_color] = color_areas.get(closest_color, 0) + 1
+    return color_areas
+
+
+def noisy_image(size=48, seed=0):
+    """Random RGB pixels, including exact ties between palette colors."""
+    rng = random.Random(seed)
+    img = Image.new("RGB", (size, size), (255, 255, 255))
+    for y in range(size):
+        for x in range(size):
+            roll = rng.random()
+            if roll < 0.2:
+                continue
+            if roll < 0.3:
+                # Equidistant from red and black -> red wins (first in COLORS)
+                pixel = (128, 0, 0)
+            else:
+                pixel = tuple(rng.randint(0, 255) for _ in range(3))
+            img.putpixel((x, y), pixel)
+    return img
+
+
+def test_area_parity_on_noisy_pixels():
+    for seed in range(3):
+        img = noisy_image(seed=seed)
+        expected = reference_color_areas(img)
+        assert list(calculate_color_areas(img).items()) == list(expected.items())
+
+
+def test_area_parity_on_dataset_image():
+    img = Image.open(os.path.join(TASK_DIR, "input", "image_1.png")).convert("RGB")
+    expected = reference_color_areas(img)
+    assert list(calculate_color_areas(img).items()) == list(expected.items())
+
+
+def test_blank_image_has_no_areas():
+    img = Image.new("RGB", (16, 16), (255, 255, 255))
+    assert calculate_color_areas(img) == {}
+
+
+def test_ground_truth_unchanged():
+    with open(os.path.join(TASK_DIR, "ground_truth_colors.json"), "r") as f:
+        ground_truth = json.load(f)
+    for filename, color in ground_truth.items():
+        img = Image.open(os.path.join(TASK_DIR, "input", filename)).convert("RGB")
+        areas = calculate_color_areas(img)
+        assert max(areas, key=areas.get) == color, filename
+
+
+def nearest_index(pixel, colors):
+    distances = [sum((a - b) ** 2 for a, b in zip(pixel, rgb)) for rgb in colors.values()]
+    return distances.index(min(distances))
+
+
+def test_lut_matches_distance_scan():
+    rng = random.Random(1)
+    pixels = [tuple(rng.randint(0, 255) for _ in range(3)) for _ in range(500)]
+    pixels += [(128, 0, 0), (0, 0, 0), (255, 255, 255), (210, 210, 0)]
+    lut = palette_lut.get_lut(COLORS)
+    for pixel in pixels:
+        assert lut[palette_lut.pack_rgb(np.array(pixel, dtype=np.uint8))] == nearest_index(pixel, COLORS)
+
+
+def test_lut_cache_keyed_by_palette():
+    small = {"red": (255, 0, 0), "blue": (0, 0, 255)}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = palette_lut.lut_path(small, cache_dir)
+        labels = palette_lut.classify_pixels(np.array([[200, 0, 10], [10, 0, 200]]), small, cache_dir)
+        assert list(labels) == [0, 1]
+        assert os.path.exists(path)
+
+        changed = dict(small, green=(0, 255, 0))
+        assert palette_lut.lut_path(changed, cache_dir) != path
+        assert palette_lut.classify_pixels(np.array([[0, 250, 0]]), changed, cache_dir)[0] == 2
+
+
+def test_label_map_areas_match_pixel_classification():
+    for i in range(1, 13):
+        img, label_map, dominant_color = render_image(image_seed(5, i), image_size=160, max_regions=11)
+        areas = label_map_areas(label_map)
+        assert list(areas.items()) == list(calculate_color_areas(img).items())
+        if areas:
+            assert dominant_color == max(areas, key=areas.get)
+
+
+def read_tree(root):
+    contents = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as f:
+                contents[os.path.relpath(path, root)] = f.read()
+    return contents
+
+
+def test_parallel_generation_is_byte_identical():
+    with tempfile.TemporaryDirectory() as serial, tempfile.TemporaryDirectory() as parallel:
+        generate_dataset(serial, num_images=6, image_size=128, seed=7, workers=1)
+        generate_dataset(parallel, num_images=6, image_size=128, seed=7, workers=3)
+        assert read_tree(serial) == read_tree(parallel)
+        with open(os.path.join(serial, "ground_truth_colors.json"), "r") as f:
+            assert list(json.load(f)) == ["image_{}.png".format(i) for i in range(1, 7)]
+
+
+def test_streaming_generation_matches_flat_layout():
+    with tempfile.TemporaryDirectory() as flat, tempfile.TemporaryDirectory() as sharded:
+        generate_dataset(flat, num_images=5, image_size=96, seed=11)
+        generate_dataset_streaming(sharded, num_images=5, image_size=96, seed=11,
+                                   workers=2, shard_size=2)
+        with open(os.path.join(flat, "ground_truth_colors.json"), "r") as f:
+            ground_truth = json.load(f)
+        with open(os.path.join(sharded, "ground_truth_colors.jsonl"), "r") as f:
+            records = [json.loads(line) for line in f]
+
+        assert {r["filename"]: r["color"] for r in records} == ground_truth
+        assert sorted(os.listdir(os.path.join(sharded, "input"))) == ["shard_00000", "shard_00001", "shard_00002"]
+        for record in records:
+            with open(os.path.join(flat, "input", record["filename"]), "rb") as f:
+                expected = f.read()
+            with open(os.path.join(sharded, "input", record["path"]), "rb") as f:
+                assert f.read() == expected
+
+        # The record generator yields the same images and labels, one at a time
+        records = iter_dataset(5, image_size=96, seed=11)
+        assert iter(records) is records
+        for filename, img, color in records:
+            assert ground_truth[filename] == color
+            with Image.open(os.path.join(flat, "input", filename)) as png:
+                assert np.array_equal(np.asarray(png.convert("RGB")), np.asarray(img))
+
+
+def test_packed_dataset_matches_pngs():
+    with tempfile.TemporaryDirectory() as out:
+        for pack, workers in (("rgb", 1), ("palettized", 2)):
+            generate_dataset(out, num_images=4, image_size=96, seed=3, workers=workers, pack=pack)
+            packed = packed_dataset.PackedDataset(os.path.join(out, "images_packed"))
+            with open(os.path.join(out, "ground_truth_colors.json"), "r") as f:
+                assert packed.labels() == json.load(f)
+            for filename in packed:
+                with Image.open(os.path.join(out, "input", filename)) as img:
+                    assert np.array_equal(packed.rgb(filename), np.asarray(img.convert("RGB")))
+            assert packed[filename].base is not None  # a view, not a copy
+
+
+def test_pack_existing_directory():
+    input_dir = os.path.join(TASK_DIR, "input")
+    with tempfile.TemporaryDirectory() as out:
+        base = os.path.join(out, "packed")
+        assert packed_dataset.pack_directory(input_dir, base, palettized=True) == 15
+        packed = packed_dataset.PackedDataset(base)
+        assert list(packed)[:3] == ["image_1.png", "image_2.png", "image_3.png"]
+        assert packed["image_4.png"].shape == (512, 512)
+        with open(os.path.join(input_dir, "targets.json"), "r") as f:
+            assert packed.labels() == json.load(f)
+        with Image.open(os.path.join(input_dir, "image_4.png")) as img:
+            assert np.array_equal(packed.rgb("image_4.png"), np.asarray(img.convert("RGB")))
+
+
+def test_palette_png_decodes_to_rgb_image():
+    with tempfile.TemporaryDirectory() as rgb_out, tempfile.TemporaryDirectory() as palette_out:
+        generate_dataset(rgb_out, num_images=3, image_size=96, seed=5)
+        generate_dataset(palette_out, num_images=3, image_size=96, seed=5,
+                         png_mode="palette", compress_level=9)
+        for i in range(1, 4):
+            filename = "image_{}.png".format(i)
+            with Image.open(os.path.join(rgb_out, "input", filename)) as expected, \
+                    Image.open(os.path.join(palette_out, "input", filename)) as actual:
+                assert actual.mode == "P"
+                assert np.array_equal(np.asarray(actual.convert("RGB")), np.asarray(expected))
+
+
+def resume_summary(out, **kwargs):
+    output = StringIO()
+    with redirect_stdout(output):
+        generate_dataset(out, resume=True, **kwargs)
+    return output.getvalue().splitlines()[0]
+
+
+def test_resume_regenerates_only_invalid_images():
+    with tempfile.TemporaryDirectory() as out, tempfile.TemporaryDirectory() as fresh:
+        generate_dataset(out, num_images=5, image_size=96, seed=13)
+        with open(os.path.join(out, "input", "image_2.png"), "r+b") as f:
+            f.write(b"corrupt")
+        os.remove(os.path.join(out, "input", "image_4.png"))
+
+        # Two damaged images plus one new image; seed comes from the manifest
+        assert resume_summary(out, num_images=6, image_size=96) == "Resuming: 3 images valid, 3 to generate"
+        generate_dataset(fresh, num_images=6, image_size=96, seed=13)
+        assert read_tree(out) == read_tree(fresh)
+
+        assert resume_summary(out, num_images=6, image_size=96) == "Resuming: 6 images valid, 0 to generate"
+        assert resume_summary(out, num_images=6, image_size=96, compress_level=1) == \
+            "Resuming: 0 images valid, 6 to generate"
+
+
+def test_tiled_counts_match_untiled_render():
+    for i in range(1, 9):
+        seed = image_seed(17, i)
+        _, label_map, dominant_color = render_image(seed, image_size=300, max_regions=11)
+        _, shapes = plan_image(seed, image_size=300, max_regions=11)
+        expected = label_map_areas(label_map)
+        for tile_size, workers in ((64, 1), (97, 2)):
+            tiled = tiled_render.tiled_color_areas(shapes, 300, tile_size, workers)
+            assert list(tiled.items()) == list(expected.items())
+        assert tiled_render.render_tiled(seed, 300, 128, max_regions=11)[1] == dominant_color
+
+    # Two colors tie at 1089 px; only first-occurrence order picks "orange"
+    seed = image_seed(0, 6335)
+    _, label_map, dominant_color = render_image(seed, image_size=128, min_regions=2, max_regions=3)
+    areas = label_map_areas(label_map)
+    assert dominant_color == "orange" and sorted(areas.values())[-2:] == [1089, 1089]
+    assert tiled_render.render_tiled(seed, 128, 64, 2, 3)[1] == dominant_color
+
+
+def test_reference_solver_recovers_ground_truth():
+    with tempfile.TemporaryDirectory() as out:
+        generate_dataset(out, num_images=6, image_size=128, seed=21, pack="palettized")
+        with open(os.path.join(out, "ground_truth_colors.json"), "r") as f:
+            ground_truth = json.load(f)
+        assert reference_solver.solve(os.path.join(out, "input"), workers=2, chunk_size=2) == ground_truth
+        assert reference_solver.solve(os.path.join(out, "images_packed")) == ground_truth
+
+
+
+def test_pixel_verification_flags_drifted_labels():
+    with tempfile.TemporaryDirectory() as out:
+        generate_dataset(out, num_images=6, image_size=128, seed=22)
+        with open(os.path.join(out, "ground_truth_colors.json"), "r") as f:
+            ground_truth = json.load(f)
+        input_dir, cache_dir = os.path.join(out, "input"), os.path.join(out, "cache")
+
+        report = verify_dataset.verify_dataset(input_dir, ground_truth, workers=2, cache_dir=cache_dir, chunk_size=2)
+        assert (report["checked"], report["cached"], report["mismatches"]) == (6, 0, [])
+        assert report["unlabeled_images"] == [] and report["missing_images"] == []
+
+        actual = ground_truth["image_3.png"]
+        ground_truth["image_3.png"] = next(color for color in COLORS if color != actual)
+        ground_truth["image_7.png"] = actual
+        report = verify_dataset.verify_dataset(input_dir, ground_truth, cache_dir=cache_dir)
+        assert report["cached"] == 6
+        assert report["mismatches"] == [{"filename": "image_3.png", "expected": ground_truth["image_3.png"],
+                                         "actual": actual}]
+        assert report["missing_images"] == ["image_7.png"]
+
+        # A blank image keeps the generator's fallback label, which pixels cannot confirm
+        Image.new("RGB", (16, 16), (255, 255, 255)).save(os.path.join(input_dir, "image_8.png"))
+        ground_truth["image_8.png"] = "red"
+        report = verify_dataset.verify_dataset(input_dir, ground_truth, cache_dir=cache_dir)
+        assert report["blank_images"] == ["image_8.png"]
+        assert [mismatch["filename"] for mismatch in report["mismatches"]] == ["image_3.png"]
+
+
+def test_area_index_matches_rendered_counts():
+    with tempfile.TemporaryDirectory() as out:
+        generate_dataset(out, num_images=5, image_size=128, seed=23, workers=2)
+        generate_dataset_streaming(os.path.join(out, "stream"), 5, image_size=128, seed=23, shard_size=2,
+                                   workers=2)
+        with open(os.path.join(out, "ground_truth_colors.json"), "r") as f:
+            ground_truth = json.load(f)
+
+        index = area_index.AreaIndex(out)
+        assert list(index) == list(ground_truth) and index.labels() == ground_truth
+        for i, filename in enumerate(index, 1):
+            color_areas = render_image_areas(image_seed(23, i), image_size=128)[3]
+            entry = index[filename]
+            assert entry["counts"] == dict(sorted(color_areas.items(), key=lambda item: list(COLORS).index(item[0])))
+            ranked = sorted(color_areas.values(), reverse=True) + [0]
+            assert entry["margin"] == ranked[0] - ranked[1]
+            assert entry["runner_up"] is None or color_areas[entry["runner_up"]] == ranked[1]
+
+        margins = [index[filename]["margin"] for filename in index.hard_cases()]
+        assert margins == sorted(margins)
+        assert index.hard_cases(limit=2) == index.hard_cases()[:2]
+
+        streamed = area_index.AreaIndex(os.path.join(out, "stream"))
+        assert list(streamed) == list(index)
+        assert [streamed[f] for f in streamed] == [index[f] for f in index]
+        assert not os.path.exists(os.path.join(out, "stream", area_index.AREA_INDEX_NAME + ".jsonl"))
+
+
+def test_compact_jsonl_keeps_arrays_out_of_memory():
+    import tracemalloc
+    num_rows = 50000
+    colors = list(COLORS)
+    with tempfile.TemporaryDirectory() as out:
+        jsonl_path = os.path.join(out, "areas.jsonl")
+        with open(jsonl_path, "w") as f:
+            for row in reversed(range(num_rows)):
+                color_areas = {colors[row % 3]: row + 2, colors[3]: row % 2}
+                area_index.append_summary(f, row, "image_{:08d}_{}.png".format(row, "x" * 24),
+                                          area_index.area_summary(color_areas))
+
+        index_path = os.path.join(out, area_index.AREA_INDEX_NAME)
+        tracemalloc.start()
+        try:
+            area_index.compact_jsonl(jsonl_path, index_path, COLORS, num_rows)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        # The filename column alone is 8 MB in RAM
+        assert peak < 2 * 1024 * 1024, peak
+        assert sorted(os.listdir(out)) == sorted(["areas.jsonl", area_index.AREA_INDEX_NAME])
+
+        index = area_index.AreaIndex(index_path)
+        assert len(index) == num_rows and index.colors == colors
+        assert index["image_00000007_{}.png".format("x" * 24)] == {
+            "counts": {colors[1]: 9, colors[3]: 1}, "dominant": colors[1], "runner_up": colors[3], "margin": 8}
+        assert index.filenames[-1] == "image_{:08d}_{}.png".format(num_rows - 1, "x" * 24)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            print("Running {}...".format(name))
+            func()
+    print("\nGenerator tests completed successfully!")
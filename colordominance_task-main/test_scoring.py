@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import sys
+import tempfile
+
+# Add the current directory to the path so we can import the scoring core
+TASK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TASK_DIR)
+
+import scoring
+
+GROUND_TRUTH = {"a.png": "Red", "b.png": "blue ", "c.png": "red", "d.png": "green"}
+
+
+def reference_metrics(predictions, ground_truth):
+    """Original dict-walking accuracy computation."""
+    correct = missing = 0
+    for filename, true_color in ground_truth.items():
+        pred_color = predictions.get(filename)
+        if not isinstance(pred_color, str):
+            missing += 1
+        elif pred_color.lower().strip() == true_color.lower().strip():
+            correct += 1
+    return correct, missing
+
+
+def test_score_matches_reference_loop():
+    predictions = {"a.png": " RED", "b.png": "red", "c.png": "red", "x.png": "red", "d.png": 3}
+    metrics = scoring.score(predictions, GROUND_TRUTH)
+    correct, missing = reference_metrics(predictions, GROUND_TRUTH)
+    assert metrics["correct_predictions"] == correct == 2
+    assert metrics["missing_predictions"] == missing == 1
+    assert metrics["wrong_predictions"] == 1
+    assert metrics["accuracy"] == 0.5
+
+
+def test_confusion_matrix_and_per_color_metrics():
+    predictions = {"a.png": "red", "b.png": "red", "c.png": "purple"}
+    metrics = scoring.score(predictions, GROUND_TRUTH)
+    confusion = metrics["confusion_matrix"]
+    assert confusion["labels"] == ["red", "blue", "green"]
+    assert confusion["columns"] == ["red", "blue", "green", "purple", scoring.MISSING_LABEL]
+    assert confusion["counts"] == [[1, 0, 0, 1, 0], [1, 0, 0, 0, 0], [0, 0, 0, 0, 1]]
+    assert metrics["per_color"]["red"] == {"precision": 0.5, "recall": 0.5, "support": 2, "predicted": 2}
+    assert metrics["per_color"]["purple"] == {"precision": 0.0, "recall": 0.0, "support": 0, "predicted": 1}
+    assert metrics["macro_recall"] == 0.5 / 3
+
+
+def test_empty_ground_truth():
+    assert scoring.score({"a.png": "red"}, {}) == scoring.EMPTY_METRICS
+
+
+def test_streaming_scorer_matches_batched_api():
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = os.path.join(tmp, "solution.jsonl")
+        with open(jsonl_path, "w") as f:
+            f.write(json.dumps({"filename": "a.png", "color": "blue"}) + "\n\n")
+            f.write(json.dumps({"filename": "a.png", "color": "Red"}) + "\n")
+            f.write(json.dumps({"filename": "b.png", "color": "BLUE"}) + "\n")
+            f.write(json.dumps({"filename": "z.png", "color": "red"}) + "\n")
+        json_path = os.path.join(tmp, "solution.json")
+        with open(json_path, "w") as f:
+            json.dump({"predictions": {"a.png": "Red", "b.png": "BLUE"}}, f)
+
+        expected = scoring.score({"a.png": "red", "b.png": "blue"}, GROUND_TRUTH)
+        assert scoring.score_file(jsonl_path, GROUND_TRUTH) == expected
+        assert scoring.score_file(json_path, GROUND_TRUTH) == expected
+
+        scorer = scoring.Scorer(GROUND_TRUTH)
+        scorer.add_file(jsonl_path)
+        assert scorer.num_predictions == 2
+        assert list(scorer.outcomes()) == [("a.png", "red", "red"), ("b.png", "blue", "blue"),
+                                           ("c.png", "red", None), ("d.png", "green", None)]
+
+
+def test_jsonl_errors_name_the_line():
+    lines = ['{"filename": "a.png", "color": "red"}\n', "{not json\n"]
+    try:
+        list(scoring.iter_predictions_jsonl(lines, "solution.jsonl"))
+    except ValueError as e:
+        assert str(e).startswith("solution.jsonl line 2:")
+    else:
+        raise AssertionError("malformed line was accepted")
+
+
+def test_repo_solution_scores_perfectly():
+    ground_truth = scoring.read_ground_truth(os.path.join(TASK_DIR, "ground_truth_colors.json"))
+    predictions = scoring.read_predictions_json(os.path.join(TASK_DIR, "test_solution.json"))
+    assert scoring.score(predictions, ground_truth)["accuracy"] == 1.0
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            print("Running {}...".format(name))
+            func()
+    print("\nScoring tests completed successfully!")
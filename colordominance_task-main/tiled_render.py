@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tiled rendering and area counting for very large stress images.
+
+A full 16k x 16k frame does not fit comfortably in memory, so the image is
+planned once with ``plan_image`` and each tile is then rendered on its own
+label raster, with shapes shifted to the tile origin, and counted.  Peak
+memory per worker is one tile, and the per-color totals equal the counts
+of an untiled render exactly.  Each tile also reports where every label
+first appears, so the merged counts keep the untiled first-occurrence key
+order and ``max`` breaks ties the same way.
+
+Usage: python tiled_render.py --image_size 16384 --tile_size 2048 --workers 8 [--out tiles/]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_inputs import (BACKGROUND_LABEL, COLOR_LABELS, COLORS, draw_shape, palette_image,
+                             plan_image)
+
+# Extra pixels drawn around each tile to keep edge clipping out of the counts
+TILE_HALO = 2
+
+# first_seen value of a label that does not occur
+NOT_SEEN = np.iinfo(np.int64).max
+
+
+def shape_bounds(shape):
+    """Inclusive ``(x0, y0, x1, y1)`` bounding box of a ``random_shape`` spec."""
+    _, x, y, size = shape
+    return x, y, x + size, y + size
+
+
+def iter_tiles(image_size, tile_size):
+    """Yield ``(x0, y0, width, height)`` for every tile in row-major order."""
+    for y0 in range(0, image_size, tile_size):
+        for x0 in range(0, image_size, tile_size):
+            yield x0, y0, min(tile_size, image_size - x0), min(tile_size, image_size - y0)
+
+
+def render_tile(shapes, tile):
+    """Render the label raster of one tile from full-image shape specs.
+
+    Pillow's polygon fill can differ by one pixel column where a shape is
+    clipped at the raster's left edge, so the tile is drawn with a
+    ``TILE_HALO`` margin on every side and cropped afterwards.
+    """
+    x0, y0, width, height = tile
+    left, top = x0 - TILE_HALO, y0 - TILE_HALO
+    right, bottom = x0 + width + TILE_HALO, y0 + height + TILE_HALO
+    label_map = Image.new("L", (right - left, bottom - top), BACKGROUND_LABEL)
+    draw = ImageDraw.Draw(label_map)
+    for color_name, shape in shapes:
+        sx0, sy0, sx1, sy1 = shape_bounds(shape)
+        if sx1 < left or sy1 < top or sx0 >= right or sy0 >= bottom:
+            continue
+        draw_shape(draw, shape, COLOR_LABELS[color_name], offset=(left, top))
+    return label_map.crop((TILE_HALO, TILE_HALO, TILE_HALO + width, TILE_HALO + height))
+
+
+def _count_tile(task):
+    """Process-pool entry point: per-label pixel counts of one tile.
+
+    Returns ``(counts, first_seen)``; ``first_seen[label]`` is the row-major
+    position in the full image of the label's first pixel in this tile, or
+    ``NOT_SEEN``.
+    """
+    shapes, tile, image_size, out_dir = task
+    x0, y0, width, _ = tile
+    label_map = render_tile(shapes, tile)
+    if out_dir:
+        palette_image(label_map).save(os.path.join(out_dir, "tile_{}_{}.png".format(y0, x0)))
+    labels = np.asarray(label_map).ravel()
+    counts = np.bincount(labels, minlength=len(COLORS) + 1)
+    first_seen = np.full(len(COLORS) + 1, NOT_SEEN, dtype=np.int64)
+    present, local = np.unique(labels, return_index=True)
+    first_seen[present] = (y0 + local // width) * image_size + x0 + local % width
+    return counts, first_seen
+
+
+def tiled_color_areas(shapes, image_size, tile_size=2048, workers=1, out_dir=None):
+    """Per-color areas of an ``image_size`` square image, counted tile by tile.
+
+    Background and white are skipped as in ``label_map_areas``; the counts
+    match it exactly, including its first-occurrence key order.  With
+    ``out_dir`` each tile is also saved as ``tile_<y0>_<x0>.png``.
+    """
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    tasks = [(shapes, tile, image_size, out_dir) for tile in iter_tiles(image_size, tile_size)]
+    counts = np.zeros(len(COLORS) + 1, dtype=np.int64)
+    first_seen = np.full(len(COLORS) + 1, NOT_SEEN, dtype=np.int64)
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_count_tile, tasks)
+    else:
+        executor = None
+        results = map(_count_tile, tasks)
+    try:
+        for tile_counts, tile_first_seen in results:
+            counts += tile_counts
+            np.minimum(first_seen, tile_first_seen, out=first_seen)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    skipped = (BACKGROUND_LABEL, COLOR_LABELS["white"])
+    names = {label: name for name, label in COLOR_LABELS.items()}
+    return {names[label]: int(counts[label]) for label in np.argsort(first_seen, kind="stable")
+            if label not in skipped and counts[label]}
+
+
+def render_tiled(seed, image_size, tile_size=2048, min_regions=3, max_regions=8, workers=1, out_dir=None):
+    """Plan one image and count it tile by tile; returns ``(color_areas, dominant_color)``."""
+    selected_colors, shapes = plan_image(seed, image_size, min_regions, max_regions)
+    color_areas = tiled_color_areas(shapes, image_size, tile_size, workers, out_dir)
+    if color_areas:
+        dominant_color = max(color_areas, key=color_areas.get)
+    else:
+        dominant_color = selected_colors[0]  # Fallback
+    return color_areas, dominant_color
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Render and count a large image tile by tile")
+    parser.add_argument("--image_size", type=int, default=16384)
+    parser.add_argument("--tile_size", type=int, default=2048)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min_regions", type=int, default=3)
+    parser.add_argument("--max_regions", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=None, help="directory to save tiles as PNGs")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    color_areas, dominant_color = render_tiled(args.seed, args.image_size, args.tile_size,
+                                               args.min_regions, args.max_regions,
+                                               args.workers, args.out)
+    elapsed = time.time() - start_time
+
+    print("{0}x{0} image, {1}x{1} tiles, {2} workers: {3:.2f}s".format(
+        args.image_size, args.tile_size, args.workers, elapsed))
+    for color, area in sorted(color_areas.items(), key=lambda item: -item[1]):
+        print("  {}: {}".format(color, area))
+    print("Dominant color: {}".format(dominant_color))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Pixel verification of ground-truth labels.
+
+Ground-truth files are copied between workspaces and can drift from the
+images they describe.  This recomputes every image's dominant color from
+its pixels with the lookup-table counter, spread over worker processes,
+and reports each label that disagrees.
+
+Blank images (no non-white pixel) carry the generator's fallback label,
+which their pixels do not determine; they are listed as such rather than
+checked.
+
+Results are cached by image content hash in ``verify_<palette hash>.jsonl``
+under ``palette_lut.CACHE_DIR``, so verifying an unchanged dataset again
+only reads and hashes the files.  Editing ``COLORS`` starts a new cache.
+
+Supports flat and sharded ``input/`` directories of PNGs.
+
+Usage: python verify_dataset.py input/ ground_truth_colors.json [--workers N]
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import palette_lut
+from generate_inputs import COLORS, calculate_color_areas
+from reference_solver import BLANK_PREDICTION, dominant_color, list_images
+
+# Colors of already verified images in this worker, keyed by content hash
+_WORKER_CACHE = {}
+
+
+def verify_cache_path(cache_dir=None):
+    return os.path.join(cache_dir or palette_lut.CACHE_DIR,
+                        "verify_{}.jsonl".format(palette_lut.palette_hash(COLORS)))
+
+
+def load_verify_cache(path):
+    """Return ``{sha256: color}``, skipping unreadable lines."""
+    cache = {}
+    if not os.path.exists(path):
+        return cache
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                cache[record["sha256"]] = record["color"]
+            except (ValueError, KeyError, TypeError):
+                continue
+    return cache
+
+
+def _init_worker(cache):
+    global _WORKER_CACHE
+    _WORKER_CACHE = cache
+
+
+def _verify_chunk(task):
+    """Process-pool entry point: ``[(filename, sha256, color, cached), ...]``."""
+    source, items = task
+    results = []
+    for filename, relpath in items:
+        with open(os.path.join(source, relpath), "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        color = _WORKER_CACHE.get(digest)
+        cached = color is not None
+        if not cached:
+            with Image.open(io.BytesIO(data)) as img:
+                color = dominant_color(calculate_color_areas(img))
+        results.append((filename, digest, color, cached))
+    return results
+
+
+def verify_dataset(input_dir, ground_truth, workers=1, cache_dir=None, chunk_size=64):
+    """Check ``ground_truth`` (``{filename: color}``) against the images in ``input_dir``.
+
+    Returns a dict with the number of images checked and served from the
+    cache, ``mismatches`` as ``{"filename", "expected", "actual"}`` records,
+    and the names of labeled images that are missing on disk, of images
+    with no label and of blank images, whose labels are not checked.
+    """
+    kind, images = list_images(input_dir)
+    if kind != "png":
+        raise ValueError("pixel verification needs a directory of PNGs, not a packed dataset")
+
+    cache_path = verify_cache_path(cache_dir)
+    cache = load_verify_cache(cache_path)
+    tasks = [(input_dir, images[i:i + chunk_size]) for i in range(0, len(images), chunk_size)]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache,)) as executor:
+            chunks = list(executor.map(_verify_chunk, tasks))
+    else:
+        _init_worker(cache)
+        chunks = [_verify_chunk(task) for task in tasks]
+
+    on_disk = set()
+    mismatches = []
+    blank_images = []
+    new_entries = {}
+    cached_count = 0
+    for chunk in chunks:
+        for filename, digest, color, cached in chunk:
+            on_disk.add(filename)
+            if cached:
+                cached_count += 1
+            else:
+                new_entries[digest] = color
+            if color == BLANK_PREDICTION:
+                blank_images.append(filename)
+                continue
+            expected = ground_truth.get(filename)
+            if expected is not None and expected.lower().strip() != color:
+                mismatches.append({"filename": filename, "expected": expected, "actual": color})
+
+    if new_entries:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "a") as f:
+                for digest, color in new_entries.items():
+                    f.write(json.dumps({"sha256": digest, "color": color}) + "\n")
+        except OSError:
+            pass
+
+    return {
+        "checked": len(images),
+        "cached": cached_count,
+        "mismatches": mismatches,
+        "missing_images": [filename for filename in ground_truth if filename not in on_disk],
+        "unlabeled_images": sorted(on_disk.difference(ground_truth)),
+        "blank_images": blank_images,
+    }
+
+
+def print_verification(report, limit=20):
+    print(f"Verified {report['checked']} images ({report['cached']} from cache): "
+          f"{len(report['mismatches'])} label mismatches, {len(report['missing_images'])} missing images, "
+          f"{len(report['unlabeled_images'])} unlabeled images, "
+          f"{len(report['blank_images'])} blank images not checked")
+    for mismatch in report["mismatches"][:limit]:
+        print(f"  {mismatch['filename']}: labeled {mismatch['expected']}, pixels say {mismatch['actual']}")
+    if len(report["mismatches"]) > limit:
+        print(f"  ... and {len(report['mismatches']) - limit} more")
+    for filename in report["missing_images"][:limit]:
+        print(f"  {filename}: labeled but not found")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Check ground-truth labels against image pixels")
+    parser.add_argument("input_dir", help="input/ directory (flat or sharded)")
+    parser.add_argument("ground_truth", help="ground-truth JSON ({filename: color})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with open(args.ground_truth, "r") as f:
+        ground_truth = json.load(f)
+
+    start_time = time.time()
+    report = verify_dataset(args.input_dir, ground_truth, args.workers)
+    elapsed = time.time() - start_time
+    print_verification(report)
+    print(f"Done in {elapsed:.2f}s with {args.workers} workers")
+    if report["mismatches"] or report["missing_images"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
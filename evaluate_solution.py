@@ -1,13 +1,75 @@
 #!/usr/bin/env python3
 """
 Simple evaluation script for Color Dominance Detection task
-Usage: python3 evaluate_solution.py solution.json ground_truth.json
+Usage: python3 evaluate_solution.py solution.json ground_truth.json [--verify-pixels input/]
+
+The solution may also be line-delimited (solution.jsonl), one
+{"filename": ..., "color": ...} object per line.
+
+When the local evaluation server (colordominance_task-main/eval_server.py)
+is running, scoring is done there and per-image lines are not printed.
+
+--verify-pixels recomputes every label from the images in the given
+directory first and fails when the ground truth disagrees with them.
 """
 
 import json
 import sys
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "colordominance_task-main"))
+
+import eval_client
+import scoring
+
+def print_summary(correct, total, wrong, missing):
+    """Print the summary block and return the result dict"""
+    accuracy = correct / total if total > 0 else 0.0
+    
+    print(f"\n📈 SUMMARY")
+    print(f"{'='*50}")
+    print(f"Correct: {correct}/{total}")
+    print(f"Wrong: {wrong}")
+    print(f"Missing: {missing}")
+    print(f"Accuracy: {accuracy:.3f} ({accuracy*100:.1f}%)")
+    
+    # Success criteria
+    if accuracy >= 1.0:
+        print(f"🎉 SUCCESS: Perfect accuracy!")
+    elif accuracy >= 0.8:
+        print(f"✅ GOOD: High accuracy")
+    else:
+        print(f"❌ FAILED: Low accuracy")
+    
+    return {
+        "accuracy": accuracy,
+        "correct": correct,
+        "total": total,
+        "wrong": wrong,
+        "missing": missing
+    }
+
+def evaluate_on_server(solution_file, ground_truth_file):
+    """Score through the running evaluation server"""
+    result = eval_client.evaluate(solution_path=solution_file, ground_truth=ground_truth_file)
+    metrics = result["metrics"]
+    if not metrics.get("total_images") and result["error_message"]:
+        print(f"❌ {result['error_message']}")
+        return None
+    
+    total = int(metrics["total_images"])
+    correct = int(metrics["correct_predictions"])
+    missing = int(metrics["missing_predictions"])
+    if missing == total:
+        print("❌ No predictions found in solution file")
+        return None
+    
+    print(f"\n📊 EVALUATION RESULTS (server {eval_client.server_address()})")
+    print(f"{'='*50}")
+    print(f"Total images: {total}")
+    print(f"Predictions provided: {total - missing}")
+    return print_summary(correct, total, total - correct - missing, missing)
+
 def evaluate_solution(solution_file, ground_truth_file):
     """Evaluate a solution against ground truth"""
     
@@ -15,83 +77,79 @@ def evaluate_solution(solution_file, ground_truth_file):
     if not os.path.exists(solution_file):
         print(f"❌ Solution file not found: {solution_file}")
         return None
-        
-    with open(solution_file, "r") as f:
-        solution_data = json.load(f)
-    
-    predictions = solution_data.get("predictions", {})
-    if not predictions:
-        print("❌ No predictions found in solution file")
-        return None
-    
-    # Load ground truth
+
     if not os.path.exists(ground_truth_file):
         print(f"❌ Ground truth file not found: {ground_truth_file}")
         return None
-        
-    with open(ground_truth_file, "r") as f:
-        ground_truth = json.load(f)
+
+    if eval_client.is_running():
+        return evaluate_on_server(solution_file, ground_truth_file)
+
+    # Score with the shared scoring core; .jsonl solutions are streamed
+    scorer = scoring.Scorer(scoring.read_ground_truth(ground_truth_file))
+    scorer.add_file(solution_file)
+    if not scorer.num_predictions:
+        print("❌ No predictions found in solution file")
+        return None
     
-    # Calculate metrics
-    correct = 0
-    total = len(ground_truth)
-    missing = 0
-    wrong = 0
+    metrics = scorer.metrics()
+    total = int(metrics["total_images"])
+    correct = int(metrics["correct_predictions"])
+    missing = int(metrics["missing_predictions"])
+    wrong = int(metrics["wrong_predictions"])
     
     print(f"\n📊 EVALUATION RESULTS")
     print(f"{'='*50}")
     print(f"Total images: {total}")
-    print(f"Predictions provided: {len(predictions)}")
+    print(f"Predictions provided: {scorer.num_predictions}")
     print()
     
     # Check each image
-    for filename, true_color in ground_truth.items():
-        pred_color = predictions.get(filename)
-        
+    for filename, true_color, pred_color in scorer.outcomes():
         if pred_color is None:
-            missing += 1
             print(f"❌ {filename}: MISSING (should be {true_color})")
-        elif pred_color.lower().strip() == true_color.lower().strip():
-            correct += 1
+        elif pred_color == true_color:
             print(f"✅ {filename}: {pred_color} (correct)")
         else:
-            wrong += 1
             print(f"❌ {filename}: {pred_color} (should be {true_color})")
     
-    # Calculate accuracy
-    accuracy = correct / total if total > 0 else 0.0
-    
-    print(f"\n📈 SUMMARY")
-    print(f"{'='*50}")
-    print(f"Correct: {correct}/{total}")
-    print(f"Wrong: {wrong}")
-    print(f"Missing: {missing}")
-    print(f"Accuracy: {accuracy:.3f} ({accuracy*100:.1f}%)")
+    return print_summary(correct, total, wrong, missing)
+
+def verify_ground_truth(ground_truth_file, input_dir):
+    """Check ground-truth labels against the image pixels; returns the mismatch count"""
+    from verify_dataset import print_verification, verify_dataset
     
-    # Success criteria
-    if accuracy >= 1.0:
-        print(f"🎉 SUCCESS: Perfect accuracy!")
-    elif accuracy >= 0.8:
-        print(f"✅ GOOD: High accuracy")
-    else:
-        print(f"❌ FAILED: Low accuracy")
+    with open(ground_truth_file, "r") as f:
+        ground_truth = json.load(f)
     
-    return {
-        "accuracy": accuracy,
-        "correct": correct,
-        "total": total,
-        "wrong": wrong,
-        "missing": missing
-    }
+    print(f"\n🔍 PIXEL VERIFICATION ({input_dir})")
+    print(f"{'='*50}")
+    report = verify_dataset(input_dir, ground_truth, workers=os.cpu_count() or 1)
+    print_verification(report)
+    return len(report["mismatches"]) + len(report["missing_images"])
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python3 evaluate_solution.py <solution.json> <ground_truth.json>")
+    args = sys.argv[1:]
+    verify_dir = None
+    if "--verify-pixels" in args:
+        i = args.index("--verify-pixels")
+        verify_dir = args[i + 1] if i + 1 < len(args) else None
+        del args[i:i + 2]
+        if verify_dir is None:
+            args = []
+    
+    if len(args) != 2:
+        print("Usage: python3 evaluate_solution.py <solution.json> <ground_truth.json> [--verify-pixels <input_dir>]")
         print("Example: python3 evaluate_solution.py solution.json colordominance_task-main/ground_truth_colors.json")
         sys.exit(1)
     
-    solution_file = sys.argv[1]
-    ground_truth_file = sys.argv[2]
+    solution_file = args[0]
+    ground_truth_file = args[1]
+    
+    if verify_dir is not None and os.path.exists(ground_truth_file):
+        if verify_ground_truth(ground_truth_file, verify_dir):
+            print("❌ Ground truth does not match the images")
+            sys.exit(1)
     
     result = evaluate_solution(solution_file, ground_truth_file)
     
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Resource metering for agent runs.
+
+``ProcessTreeMeter`` samples the process tree rooted at an agent's PID
+from a background thread, reading ``/proc/<pid>/stat``, ``status`` and
+``io`` of every live descendant:
+
+- CPU time: user + system time of each live process plus its reaped
+  children (``cutime``/``cstime``), so finished helpers still count
+- peak RSS: the largest summed resident set of the tree at any sample,
+  or the largest single-process high-water mark (``VmHWM``) if higher
+- processes: distinct PIDs observed in the tree
+- disk bytes written: ``write_bytes`` of ``/proc/<pid>/io``, which also
+  folds in reaped children
+
+Short-lived processes and work done after the last sample are not seen
+by ``/proc``.  When no other metered run overlapped, the
+``resource.getrusage(RUSAGE_CHILDREN)`` delta belongs to this run alone,
+and its CPU time, block output and (if it grew) max RSS replace the
+sampled values when larger.  Processes that detach from the tree
+(daemonize) are not followed.
+"""
+
+import os
+import resource
+import threading
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+EMPTY_USAGE = {"cpu_seconds": 0.0, "peak_rss_bytes": 0, "processes": 0, "disk_write_bytes": 0, "samples": 0}
+
+
+def _read(path):
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_stat(pid):
+    """``(ppid, cpu_seconds, rss_bytes)`` of a process, or None if it is gone."""
+    data = _read(f"/proc/{pid}/stat")
+    if data is None:
+        return None
+    # Fields after the parenthesized command name start at field 3 (state)
+    fields = data[data.rindex(")") + 2:].split()
+    ticks = sum(int(value) for value in fields[11:15])  # utime stime cutime cstime
+    return int(fields[1]), ticks / CLOCK_TICKS, int(fields[21]) * PAGE_SIZE
+
+
+def read_hwm(pid):
+    """Peak resident set (``VmHWM``) of a process in bytes, 0 if unknown."""
+    for line in (_read(f"/proc/{pid}/status") or "").splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) * 1024
+    return 0
+
+
+def read_write_bytes(pid):
+    for line in (_read(f"/proc/{pid}/io") or "").splitlines():
+        if line.startswith("write_bytes:"):
+            return int(line.split()[1])
+    return 0
+
+
+def children(pid):
+    """Direct children of ``pid``, from ``/proc/<pid>/task/*/children`` or a /proc scan."""
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return []
+    result = []
+    for tid in tids:
+        data = _read(f"/proc/{pid}/task/{tid}/children")
+        if data is None:
+            break
+        result.extend(int(child) for child in data.split())
+    else:
+        return result
+
+    # Kernels without CONFIG_PROC_CHILDREN
+    result = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            stat = read_stat(entry)
+            if stat is not None and stat[0] == pid:
+                result.append(int(entry))
+    return result
+
+
+def process_tree(pid):
+    """``pid`` and all of its live descendants."""
+    tree = []
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children(current))
+    return tree
+
+
+class ProcessTreeMeter:
+    """Samples the resource usage of ``pid``'s process tree until ``stop``."""
+
+    _lock = threading.Lock()
+    _active = set()
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.cpu_seconds = 0.0
+        self.peak_rss_bytes = 0
+        self.disk_write_bytes = 0
+        self.pids = set()
+        self.samples = 0
+        self.overlapped = False
+        self._stopped = threading.Event()
+        self._thread = None
+        self._rusage_start = None
+
+    def sample(self):
+        cpu_seconds = 0.0
+        rss_bytes = 0
+        write_bytes = 0
+        for pid in process_tree(self.pid):
+            stat = read_stat(pid)
+            if stat is None:
+                continue
+            self.pids.add(pid)
+            cpu_seconds += stat[1]
+            rss_bytes += stat[2]
+            write_bytes += read_write_bytes(pid)
+            self.peak_rss_bytes = max(self.peak_rss_bytes, read_hwm(pid))
+        # Totals drop when a process exits unreaped or the root exits; keep the maxima
+        self.cpu_seconds = max(self.cpu_seconds, cpu_seconds)
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss_bytes)
+        self.disk_write_bytes = max(self.disk_write_bytes, write_bytes)
+        self.samples += 1
+
+    def _run(self):
+        while True:
+            self.sample()
+            if self._stopped.wait(self.interval):
+                return
+
+    def start(self):
+        with self._lock:
+            if self._active:
+                self.overlapped = True
+                for meter in self._active:
+                    meter.overlapped = True
+            self._active.add(self)
+        self._rusage_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and return the usage (see ``usage``)."""
+        rusage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self._stopped.set()
+        self._thread.join()
+        with self._lock:
+            self._active.discard(self)
+        if not self.overlapped:
+            start = self._rusage_start
+            cpu_seconds = rusage.ru_utime + rusage.ru_stime - start.ru_utime - start.ru_stime
+            self.cpu_seconds = max(self.cpu_seconds, cpu_seconds)
+            # ru_oublock counts 512-byte blocks
+            self.disk_write_bytes = max(self.disk_write_bytes, (rusage.ru_oublock - start.ru_oublock) * 512)
+            # ru_maxrss (KB) is the largest child ever reaped; it only describes this run if it grew
+            if rusage.ru_maxrss > start.ru_maxrss:
+                self.peak_rss_bytes = max(self.peak_rss_bytes, rusage.ru_maxrss * 1024)
+        return self.usage()
+
+    def usage(self):
+        """``{"cpu_seconds", "peak_rss_bytes", "processes", "disk_write_bytes", "samples"}``"""
+        return {
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "processes": len(self.pids),
+            "disk_write_bytes": self.disk_write_bytes,
+            "samples": self.samples,
+        }
+
+
+def format_bytes(num_bytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.0f}{unit}" if unit == "B" else f"{num_bytes:.1f}{unit}"
+        num_bytes /= 1024
+
+
+def describe(usage):
+    return (f"CPU: {usage['cpu_seconds']:.1f}s | RSS: {format_bytes(usage['peak_rss_bytes'])} | "
+            f"Procs: {usage['processes']} | Written: {format_bytes(usage['disk_write_bytes'])}")
@@ -7,6 +7,11 @@ import os
 import subprocess
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "colordominance_task-main"))
+
+import agent_probe
+import workspaces
+
 def check_python_version():
     """Check if Python version is compatible"""
     if sys.version_info < (3, 6):
@@ -48,39 +53,40 @@ def check_agents():
         "claude-code": "claude-code --version"
     }
     
+    # Probed concurrently and cached until the binary changes
+    probes = agent_probe.probe_all({agent: cmd.split() for agent, cmd in agents.items()}, timeout=5)
+    
     available = []
-    for agent, cmd in agents.items():
-        try:
-            result = subprocess.run(cmd.split(), capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                available.append(agent)
-                print(f"✅ {agent} available")
-            else:
-                print(f"❌ {agent} not working")
-        except (subprocess.TimeoutExpired, FileNotFoundError):
+    for agent, probe in probes.items():
+        if probe["status"] == agent_probe.OK:
+            available.append(agent)
+            print(f"✅ {agent} available" + (f" ({probe['version']})" if probe["version"] else ""))
+        elif probe["status"] == agent_probe.MISSING:
             print(f"❌ {agent} not installed")
+        elif probe["status"] == agent_probe.TIMEOUT:
+            print(f"❌ {agent} timed out")
+        elif probe["status"] == agent_probe.EXEC_FAILED:
+            print(f"❌ {agent} cannot be executed")
+        else:
+            print(f"❌ {agent} not working")
     
     return available
 
 def create_test_workspace():
-    """Create a clean test workspace"""
+    """Create a clean test workspace (input images are linked, see workspaces.py)"""
     workspace = "test_workspace"
     
     if os.path.exists(workspace):
         print(f"🧹 Cleaning existing workspace: {workspace}")
-        import shutil
-        shutil.rmtree(workspace)
-    
-    os.makedirs(workspace)
     
-    # Copy task files
-    import shutil
-    shutil.copytree("colordominance_task-main/input", f"{workspace}/input")
-    shutil.copy("colordominance_task-main/prompt.md", workspace)
-    shutil.copy("colordominance_task-main/config.json", workspace)
-    shutil.copy("colordominance_task-main/ground_truth_colors.json", workspace)
+    _, methods = workspaces.provision_workspace(
+        workspace,
+        shared_dirs=[("colordominance_task-main/input", "input")],
+        copied_files=["colordominance_task-main/prompt.md",
+                      "colordominance_task-main/config.json",
+                      "colordominance_task-main/ground_truth_colors.json"])
     
-    print(f"✅ Test workspace created: {workspace}")
+    print(f"✅ Test workspace created: {workspace} (input/: {workspaces.describe(methods)})")
     return workspace
 
 def create_sample_solution():
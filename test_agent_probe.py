@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "colordominance_task-main"))
+
+import agent_probe
+
+# Fake agent CLIs by expected probe status
+FAKE_AGENTS = {
+    "fake-ok": "#!/bin/sh\necho 'fake-ok 1.2.3'\n",
+    "fake-failed": "#!/bin/sh\necho 'no API key' >&2\nexit 1\n",
+    "fake-timeout": "#!/bin/sh\nexec sleep 5\n",
+    "fake-bad-interpreter": "#!/nonexistent/interpreter\n",
+}
+
+COMMANDS = {name: [name, "--version"] for name in list(FAKE_AGENTS) + ["fake-missing"]}
+
+
+@contextmanager
+def fake_agents():
+    """Fake agents on PATH; yields ``(bin_dir, cache_dir)``."""
+    path = os.environ["PATH"]
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_dir = os.path.join(tmp, "bin")
+        os.makedirs(bin_dir)
+        for name, script in FAKE_AGENTS.items():
+            with open(os.path.join(bin_dir, name), "w") as f:
+                f.write(script)
+            os.chmod(os.path.join(bin_dir, name), 0o755)
+        os.environ["PATH"] = bin_dir + os.pathsep + path
+        try:
+            yield bin_dir, os.path.join(tmp, "cache")
+        finally:
+            os.environ["PATH"] = path
+
+
+def statuses(probes):
+    return {name: (probe["status"], probe["cached"]) for name, probe in probes.items()}
+
+
+def test_probe_statuses_and_caching():
+    with fake_agents() as (bin_dir, cache_dir):
+        probes = agent_probe.probe_all(COMMANDS, timeout=0.5, cache_dir=cache_dir)
+        assert list(probes) == list(COMMANDS)
+        assert statuses(probes) == {
+            "fake-ok": (agent_probe.OK, False),
+            "fake-failed": (agent_probe.FAILED, False),
+            "fake-timeout": (agent_probe.TIMEOUT, False),
+            "fake-bad-interpreter": (agent_probe.EXEC_FAILED, False),
+            "fake-missing": (agent_probe.MISSING, False),
+        }
+        assert probes["fake-ok"]["version"] == "fake-ok 1.2.3"
+        assert probes["fake-failed"]["version"] == "no API key"
+        assert probes["fake-ok"]["path"] == os.path.realpath(os.path.join(bin_dir, "fake-ok"))
+
+        # Only the OK probe comes from the cache on the next run
+        probes = agent_probe.probe_all(COMMANDS, timeout=0.5, cache_dir=cache_dir)
+        assert {name for name, (_, cached) in statuses(probes).items() if cached} == {"fake-ok"}
+        assert probes["fake-ok"]["version"] == "fake-ok 1.2.3"
+        assert list(agent_probe.load_cache(agent_probe.cache_path(cache_dir))) == ["fake-ok --version"]
+
+
+def test_changed_binary_invalidates_cache():
+    with fake_agents() as (bin_dir, cache_dir):
+        commands = {"fake-ok": COMMANDS["fake-ok"]}
+        assert not agent_probe.probe_all(commands, cache_dir=cache_dir)["fake-ok"]["cached"]
+        assert agent_probe.probe_all(commands, cache_dir=cache_dir)["fake-ok"]["cached"]
+
+        path = os.path.join(bin_dir, "fake-ok")
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        probe = agent_probe.probe_all(commands, cache_dir=cache_dir)["fake-ok"]
+        assert not probe["cached"] and probe["status"] == agent_probe.OK
+        assert agent_probe.probe_all(commands, cache_dir=cache_dir)["fake-ok"]["cached"]
+
+        # A failing replacement is probed again rather than served from the cache
+        with open(path, "w") as f:
+            f.write(FAKE_AGENTS["fake-failed"])
+        assert statuses(agent_probe.probe_all(commands, cache_dir=cache_dir)) == {
+            "fake-ok": (agent_probe.FAILED, False)}
+
+
+def test_use_cache_false_ignores_cache():
+    with fake_agents() as (bin_dir, cache_dir):
+        commands = {"fake-ok": COMMANDS["fake-ok"]}
+        agent_probe.probe_all(commands, cache_dir=cache_dir)
+        assert not agent_probe.probe_all(commands, cache_dir=cache_dir, use_cache=False)["fake-ok"]["cached"]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            print("Running {}...".format(name))
+            func()
+    print("\nAgent probe tests completed successfully!")
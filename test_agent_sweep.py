@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "colordominance_task-main"))
+
+import palette_lut
+import test_agents
+
+GROUND_TRUTH = {"a.png": "red", "b.png": "blue"}
+
+# Fake agent CLIs: run in the workspace and write its solution.json
+FAKE_AGENTS = {
+    "aide": "#!/bin/sh\nprintf '{not json' > solution.json\n",
+    "openhands": "#!/bin/sh\ncat > solution.json <<'EOF'\n{}\nEOF\n".format(json.dumps({"predictions": GROUND_TRUTH})),
+}
+
+
+@contextmanager
+def fake_task():
+    """A scratch task dir and fake agents on PATH, with the sweep running inside it."""
+    cwd = os.getcwd()
+    saved = (test_agents.TASK_DIR, palette_lut.CACHE_DIR, os.environ["PATH"])
+    with tempfile.TemporaryDirectory() as tmp:
+        task_dir = os.path.join(tmp, "task")
+        os.makedirs(os.path.join(task_dir, "input"))
+        for filename in GROUND_TRUTH:
+            with open(os.path.join(task_dir, "input", filename), "wb") as f:
+                f.write(filename.encode())
+        for name, content in (("prompt.md", "Find the dominant color."), ("config.json", "{}"),
+                              ("ground_truth_colors.json", json.dumps(GROUND_TRUTH))):
+            with open(os.path.join(task_dir, name), "w") as f:
+                f.write(content)
+
+        bin_dir = os.path.join(tmp, "bin")
+        os.makedirs(bin_dir)
+        for command, script in FAKE_AGENTS.items():
+            path = os.path.join(bin_dir, command)
+            with open(path, "w") as f:
+                f.write(script)
+            os.chmod(path, 0o755)
+
+        os.chdir(tmp)
+        test_agents.TASK_DIR = "task"
+        palette_lut.CACHE_DIR = os.path.join(tmp, "cache")
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+            test_agents.TASK_DIR, palette_lut.CACHE_DIR, os.environ["PATH"] = saved
+
+
+def test_malformed_solution_does_not_abort_sweep():
+    with fake_task():
+        results, stats = asyncio.run(test_agents.run_trials(["AIDE", "OpenHands"], trials=2))
+
+    assert [(r["agent"], r["trial"]) for r in results] == [("AIDE", 1), ("OpenHands", 1),
+                                                           ("AIDE", 2), ("OpenHands", 2)]
+    for result in results:
+        assert result["success"]
+        if result["agent"] == "AIDE":
+            assert result["evaluation"]["accuracy"] == 0.0
+            assert result["evaluation"]["error"].startswith("JSONDecodeError")
+        else:
+            assert result["evaluation"]["accuracy"] == 1.0
+            assert "error" not in result["evaluation"]
+    assert len(stats[("AIDE", "default")]) == 2
+
+
+def test_blocking_runner_wraps_async_runner():
+    with fake_task() as tmp:
+        workspace_dir, _ = test_agents.create_agent_workspace("OpenHands")
+        result = test_agents.run_agent_test("OpenHands", workspace_dir)
+        assert result["success"] and result["solution_file"] == os.path.join(workspace_dir, "solution.json")
+        assert os.path.exists(os.path.join(tmp, workspace_dir, "solution.json"))
+
+
+def test_repeated_sweep_labels_every_run():
+    results = [{"agent": "AIDE", "mode": mode, "trial": trial} for trial in (1, 2) for mode in ("default", "human")]
+    assert [test_agents.run_label(result, repeated=True) for result in results] == [
+        "AIDE [default #1]", "AIDE [human #1]", "AIDE [default #2]", "AIDE [human #2]"]
+    assert test_agents.run_label(results[0]) == "AIDE"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            print("Running {}...".format(name))
+            func()
+    print("\nAgent sweep tests completed successfully!")
@@ -2,17 +2,43 @@
 """
 Agent Testing Script for Color Dominance Detection Task
 Tests 4 agents: AIDE, OpenHands, GoogleCLI, Claude Code
+
+Agents run concurrently, each in its own workspace, with at most
+--max-concurrency runs at a time (default: all of them).
+
+--trials N runs every (agent, mode) pair N times, interleaved so one
+agent's trials are spread over the sweep, and prints mean, standard
+deviation and 95% confidence intervals of accuracy and wall time as
+trials finish.  --ci-width W stops a pair early once its accuracy
+interval half width is at most W (after --min-trials).
+Each run's CPU time, peak RSS, process count and disk writes are
+sampled across the agent's process tree (see resource_meter.py).
+Usage: python3 test_agents.py [--max-concurrency N] [--trials N] [--modes default human]
+                              [--ci-width W] [--min-trials N]
 """
 
+import asyncio
 import os
 import json
 import time
-import subprocess
-import shutil
+import sys
 from datetime import datetime
 
 # Task configuration
 TASK_DIR = "colordominance_task-main"
+AGENT_TIMEOUT = 1800  # 30 min per agent run
+
+# Prompting modes: name -> with_human_prompting
+MODES = {"default": False, "human": True}
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), TASK_DIR))
+
+import agent_probe
+import eval_client
+import resource_meter
+import scoring
+import trial_stats
+import workspaces
 AGENTS = {
     "AIDE": {
         "command": "aide",
@@ -37,40 +63,59 @@ AGENTS = {
 }
 
 def check_agent_availability():
-    """Check which agents are available on the system"""
+    """Check which agents are available on the system
+    
+    Probes run concurrently and are cached until the agent binary changes
+    (see agent_probe.py).
+    """
+    probes = agent_probe.probe_all(
+        {agent_name: [config["command"], "--version"] for agent_name, config in AGENTS.items()}, timeout=10)
     available = {}
-    for agent_name, config in AGENTS.items():
-        try:
-            result = subprocess.run([config["command"], "--version"], 
-                                  capture_output=True, text=True, timeout=10)
-            available[agent_name] = True
-            print(f"✅ {agent_name}: Available")
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError):
-            available[agent_name] = False
+    for agent_name, probe in probes.items():
+        available[agent_name] = probe["status"] in (agent_probe.OK, agent_probe.FAILED)
+        if available[agent_name]:
+            version = f" ({probe['version']})" if probe["version"] else ""
+            cached = ", cached" if probe["cached"] else ""
+            print(f"✅ {agent_name}: Available{version} [{probe['path']}{cached}]")
+        elif probe["status"] == agent_probe.EXEC_FAILED:
+            print(f"❌ {agent_name}: Not available ({probe['path']} cannot be executed)")
+        else:
             print(f"❌ {agent_name}: Not available")
     return available
 
-def create_agent_workspace(agent_name):
-    """Create a clean workspace for the agent"""
-    workspace_dir = f"workspace_{agent_name.lower().replace(' ', '_')}"
-    if os.path.exists(workspace_dir):
-        shutil.rmtree(workspace_dir)
-    os.makedirs(workspace_dir)
+def create_agent_workspace(agent_name, suffix=""):
+    """Create a clean workspace for the agent
     
-    # Copy task files
-    shutil.copytree(f"{TASK_DIR}/input", f"{workspace_dir}/input")
-    shutil.copy(f"{TASK_DIR}/prompt.md", workspace_dir)
-    shutil.copy(f"{TASK_DIR}/config.json", workspace_dir)
+    Input images are linked in rather than copied (see workspaces.py).
+    ``suffix`` tells apart concurrent trials of the same agent.
+    Returns the workspace path and a snapshot of the shared inputs.
+    """
+    workspace_dir = f"workspace_{agent_name.lower().replace(' ', '_')}{suffix}"
+    inputs_snapshot, methods = workspaces.provision_workspace(
+        workspace_dir,
+        shared_dirs=[(f"{TASK_DIR}/input", "input")],
+        copied_files=[f"{TASK_DIR}/prompt.md", f"{TASK_DIR}/config.json"])
+    print(f"📁 {workspace_dir}: input/ provisioned ({workspaces.describe(methods)})")
     
-    return workspace_dir
+    return workspace_dir, inputs_snapshot
 
-def run_agent_test(agent_name, workspace_dir, with_human_prompting=False):
-    """Run a single agent test"""
-    print(f"\n{'='*60}")
-    print(f"Testing {agent_name}")
-    print(f"{'='*60}")
+def check_inputs(result, inputs_snapshot):
+    """Flag a run during which the shared input files changed, and restore them
     
-    # Create the prompt file for the agent
+    Changed files are put back from the pristine copy made before the runs
+    started.  With concurrent runs on hardlinked inputs, every run that
+    overlapped the modifying one is flagged too.
+    """
+    changed = workspaces.changed_inputs(inputs_snapshot)
+    if changed:
+        result["inputs_modified"] = changed
+        result["inputs_restored"] = workspaces.restore_inputs(changed, f"{TASK_DIR}/input")
+        print(f"⚠️  {len(changed)} shared input files changed during the {result['agent']} run, e.g. {changed[0]}; "
+              f"restored {len(result['inputs_restored'])}")
+    return result
+
+def write_task_prompt(workspace_dir, with_human_prompting=False):
+    """Write the agent's task_prompt.txt into its workspace"""
     prompt_file = os.path.join(workspace_dir, "task_prompt.txt")
     with open(prompt_file, "w") as f:
         f.write("COLOR DOMINANCE DETECTION TASK\n")
@@ -90,148 +135,185 @@ def run_agent_test(agent_name, workspace_dir, with_human_prompting=False):
             f.write("- A human will provide feedback during your work\n")
             f.write("- Follow their guidance to improve your solution\n")
             f.write("- Maximum 15 human prompts will be provided\n")
+    return prompt_file
+
+def agent_command(agent_name, prompt_file, workspace_dir):
+    """Command line that runs one agent on the task"""
+    if agent_name == "AIDE":
+        return ["aide", "solve", "--task", prompt_file, "--workspace", workspace_dir]
+    elif agent_name == "OpenHands":
+        return ["openhands", "run", "--prompt", prompt_file, "--workspace", workspace_dir]
+    elif agent_name == "GoogleCLI":
+        return ["googlecli", "solve", "--prompt", prompt_file, "--output", workspace_dir]
+    elif agent_name == "Claude Code":
+        return ["claude-code", "solve", "--prompt", prompt_file, "--workspace", workspace_dir]
+    raise ValueError(f"Unknown agent: {agent_name}")
+
+def run_result(agent_name, workspace_dir, execution_time, stdout, stderr, resources):
+    """Result record for a finished agent process"""
+    solution_file = os.path.join(workspace_dir, "solution.json")
+    success = os.path.exists(solution_file)
+    
+    if success:
+        print(f"✅ {agent_name} completed successfully in {execution_time:.2f}s")
+        print(f"Solution file created: {solution_file}")
+        print(f"Resources: {resource_meter.describe(resources)}")
+    else:
+        print(f"❌ {agent_name} failed - no solution file created")
+        print(f"Error output: {stderr}")
+    
+    return {
+        "agent": agent_name,
+        "success": success,
+        "execution_time": execution_time,
+        "solution_file": solution_file if success else None,
+        "resources": resources,
+        "stdout": stdout,
+        "stderr": stderr
+    }
+
+def failed_result(agent_name, execution_time, stderr, resources=None):
+    return {
+        "agent": agent_name,
+        "success": False,
+        "execution_time": execution_time,
+        "solution_file": None,
+        "resources": resources or dict(resource_meter.EMPTY_USAGE),
+        "stdout": "",
+        "stderr": stderr
+    }
+
+async def run_agent_test_async(agent_name, workspace_dir, with_human_prompting=False):
+    """Run a single agent test on an asyncio subprocess, so other agents keep running"""
+    print(f"\n▶️  Starting {agent_name} in {workspace_dir}")
+    prompt_file = write_task_prompt(workspace_dir, with_human_prompting)
     
-    # Run the agent
     start_time = time.time()
+    process = None
+    meter = None
     try:
-        if agent_name == "AIDE":
-            cmd = ["aide", "solve", "--task", prompt_file, "--workspace", workspace_dir]
-        elif agent_name == "OpenHands":
-            cmd = ["openhands", "run", "--prompt", prompt_file, "--workspace", workspace_dir]
-        elif agent_name == "GoogleCLI":
-            cmd = ["googlecli", "solve", "--prompt", prompt_file, "--output", workspace_dir]
-        elif agent_name == "Claude Code":
-            cmd = ["claude-code", "solve", "--prompt", prompt_file, "--workspace", workspace_dir]
-        else:
-            raise ValueError(f"Unknown agent: {agent_name}")
-        
+        cmd = agent_command(agent_name, prompt_file, workspace_dir)
         print(f"Running command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, cwd=workspace_dir, capture_output=True, text=True, timeout=1800)  # 30 min timeout
+        process = await asyncio.create_subprocess_exec(
+            *cmd, cwd=workspace_dir, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        meter = resource_meter.ProcessTreeMeter(process.pid).start()
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=AGENT_TIMEOUT)
+        return run_result(agent_name, workspace_dir, time.time() - start_time,
+                          stdout.decode(errors="replace"), stderr.decode(errors="replace"), meter.stop())
         
-        execution_time = time.time() - start_time
-        
-        # Check if solution was created
-        solution_file = os.path.join(workspace_dir, "solution.json")
-        success = os.path.exists(solution_file)
-        
-        if success:
-            print(f"✅ {agent_name} completed successfully in {execution_time:.2f}s")
-            print(f"Solution file created: {solution_file}")
-        else:
-            print(f"❌ {agent_name} failed - no solution file created")
-            print(f"Error output: {result.stderr}")
-        
-        return {
-            "agent": agent_name,
-            "success": success,
-            "execution_time": execution_time,
-            "solution_file": solution_file if success else None,
-            "stdout": result.stdout,
-            "stderr": result.stderr
-        }
-        
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
         print(f"⏰ {agent_name} timed out after 30 minutes")
-        return {
-            "agent": agent_name,
-            "success": False,
-            "execution_time": 1800,
-            "solution_file": None,
-            "stdout": "",
-            "stderr": "Timeout after 30 minutes"
-        }
+        return failed_result(agent_name, AGENT_TIMEOUT, "Timeout after 30 minutes", meter.stop())
     except Exception as e:
         print(f"❌ {agent_name} failed with error: {str(e)}")
-        return {
-            "agent": agent_name,
-            "success": False,
-            "execution_time": time.time() - start_time,
-            "solution_file": None,
-            "stdout": "",
-            "stderr": str(e)
-        }
+        return failed_result(agent_name, time.time() - start_time, str(e), meter.stop() if meter else None)
+
+def run_agent_test(agent_name, workspace_dir, with_human_prompting=False):
+    """Run a single agent test, blocking until it finishes"""
+    return asyncio.run(run_agent_test_async(agent_name, workspace_dir, with_human_prompting))
 
 def evaluate_solution(solution_file, ground_truth_file):
     """Evaluate a solution against ground truth"""
     if not os.path.exists(solution_file):
         return {"accuracy": 0.0, "correct": 0, "total": 0, "missing": 0}
     
-    # Load predictions
-    with open(solution_file, "r") as f:
-        data = json.load(f)
-    predictions = data.get("predictions", {})
-    
-    # Load ground truth
-    with open(ground_truth_file, "r") as f:
-        ground_truth = json.load(f)
-    
-    # Calculate metrics
-    correct = 0
-    total = len(ground_truth)
-    missing = 0
-    
-    for filename, true_color in ground_truth.items():
-        pred_color = predictions.get(filename)
-        if pred_color is None:
-            missing += 1
-            continue
-        if pred_color.lower().strip() == true_color.lower().strip():
-            correct += 1
-    
-    accuracy = correct / total if total > 0 else 0.0
+    # Use the local evaluation server when one is running
+    if eval_client.is_running():
+        metrics = eval_client.evaluate(solution_path=solution_file, ground_truth=ground_truth_file)["metrics"]
+    else:
+        metrics = scoring.score_file(solution_file, scoring.read_ground_truth(ground_truth_file))
     
     return {
-        "accuracy": accuracy,
-        "correct": correct,
-        "total": total,
-        "missing": missing
+        "accuracy": metrics["accuracy"],
+        "correct": int(metrics["correct_predictions"]),
+        "total": int(metrics["total_images"]),
+        "missing": int(metrics["missing_predictions"])
     }
 
-def run_all_tests():
-    """Run tests for all available agents"""
-    print("COLOR DOMINANCE DETECTION - AGENT TESTING")
-    print("="*60)
-    
-    # Check agent availability
-    available_agents = check_agent_availability()
-    
-    if not any(available_agents.values()):
-        print("\n❌ No agents are available on this system.")
-        print("Please install at least one of the following:")
-        for agent_name in AGENTS.keys():
-            print(f"  - {agent_name}")
-        return
+def evaluate_result(result):
+    """Attach the evaluation of an agent run's solution to its result
+
+    A solution that cannot be scored (e.g. malformed JSON) counts as
+    accuracy 0 with the error recorded, so one bad run does not abort a
+    sweep.
+    """
+    if result["success"]:
+        ground_truth_file = f"{TASK_DIR}/ground_truth_colors.json"
+        try:
+            evaluation = evaluate_solution(result["solution_file"], ground_truth_file)
+        except Exception as e:
+            print(f"❌ {result['agent']} evaluation failed: {str(e)}")
+            result["evaluation"] = {"accuracy": 0.0, "correct": 0, "total": 0, "missing": 0,
+                                    "error": f"{type(e).__name__}: {e}"}
+            return result
+        result["evaluation"] = evaluation
+        print(f"📊 {result['agent']} accuracy: {evaluation['accuracy']:.3f} ({evaluation['correct']}/{evaluation['total']})")
+    else:
+        result["evaluation"] = {"accuracy": 0.0, "correct": 0, "total": 15, "missing": 15}
+    return result
+
+async def run_trial(agent_name, mode, trial, suffix, slots, stats, ci_width, min_trials):
+    """Provision, run and evaluate one trial once a concurrency slot is free
     
-    # Run tests
-    results = []
+    Returns None when the pair's accuracy interval converged before the
+    trial got a slot.
+    """
+    pair_stats = stats[(agent_name, mode)]
+    async with slots:
+        if pair_stats.converged(ci_width, min_trials):
+            return None
+        workspace_dir, inputs_snapshot = await asyncio.to_thread(create_agent_workspace, agent_name, suffix)
+        result = await run_agent_test_async(agent_name, workspace_dir, with_human_prompting=MODES[mode])
+        check_inputs(result, inputs_snapshot)
+    result = await asyncio.to_thread(evaluate_result, result)
+    result["mode"] = mode
+    result["trial"] = trial
     
-    for agent_name, is_available in available_agents.items():
-        if not is_available:
-            print(f"\n⏭️  Skipping {agent_name} (not available)")
-            continue
-            
-        # Test without human prompting
-        workspace_dir = create_agent_workspace(agent_name)
-        result = run_agent_test(agent_name, workspace_dir, with_human_prompting=False)
-        
-        # Evaluate solution if created
-        if result["success"]:
-            ground_truth_file = f"{TASK_DIR}/ground_truth_colors.json"
-            evaluation = evaluate_solution(result["solution_file"], ground_truth_file)
-            result["evaluation"] = evaluation
-            print(f"📊 Accuracy: {evaluation['accuracy']:.3f} ({evaluation['correct']}/{evaluation['total']})")
-        else:
-            result["evaluation"] = {"accuracy": 0.0, "correct": 0, "total": 15, "missing": 15}
-        
-        results.append(result)
+    pair_stats.add(result)
+    summary = pair_stats.summary()
+    print(f"📈 {agent_name} [{mode}] after {summary['trials']} trials: "
+          f"accuracy {trial_stats.format_interval(summary['accuracy'])}, "
+          f"time {trial_stats.format_interval(summary['wall_time'], 1)}s")
+    return result
+
+async def run_trials(agent_names, modes=("default",), trials=1, max_concurrency=len(AGENTS),
+                     ci_width=None, min_trials=3):
+    """Run ``trials`` trials of every (agent, mode) pair concurrently
     
-    # Print summary
+    Trials are queued round-robin (trial 1 of every pair, then trial 2, ...)
+    and the semaphore hands out slots in queue order.  Returns the finished
+    results in queue order and ``{(agent, mode): TrialStats}``.
+    """
+    slots = asyncio.Semaphore(max_concurrency)
+    workspaces.refresh_pristine(f"{TASK_DIR}/input")
+    stats = {(agent_name, mode): trial_stats.TrialStats() for agent_name in agent_names for mode in modes}
+    single = trials == 1 and list(modes) == ["default"]
+    runs = []
+    for trial in range(1, trials + 1):
+        for agent_name in agent_names:
+            for mode in modes:
+                # Keep the historical workspace name for a plain single run
+                suffix = "" if single else f"_{mode}_{trial}"
+                runs.append(run_trial(agent_name, mode, trial, suffix, slots, stats, ci_width, min_trials))
+    results = await asyncio.gather(*runs)
+    return [result for result in results if result is not None], stats
+
+def run_label(result, repeated=False):
+    """Agent name, plus mode and trial number in a repeated sweep"""
+    if repeated:
+        return f"{result['agent']} [{result['mode']} #{result['trial']}]"
+    return result["agent"]
+
+def print_summary(results, repeated=False):
     print(f"\n{'='*60}")
     print("TESTING SUMMARY")
     print(f"{'='*60}")
     
-    for result in results:
-        agent = result["agent"]
+    labels = [run_label(result, repeated) for result in results]
+    width = max([15] + [len(label) for label in labels])
+    for agent, result in zip(labels, results):
         success = result["success"]
         accuracy = result["evaluation"]["accuracy"]
         correct = result["evaluation"]["correct"]
@@ -239,9 +321,24 @@ def run_all_tests():
         time_taken = result["execution_time"]
         
         status = "✅ SUCCESS" if success else "❌ FAILED"
-        print(f"{agent:15} | {status:10} | Accuracy: {accuracy:.3f} ({correct}/{total}) | Time: {time_taken:.1f}s")
+        print(f"{agent:{width}} | {status:10} | Accuracy: {accuracy:.3f} ({correct}/{total}) | Time: {time_taken:.1f}s | "
+              f"{resource_meter.describe(result['resources'])}")
+
+def print_trial_summary(stats):
+    print(f"\n{'='*60}")
+    print("TRIAL STATISTICS (mean ± std [95% CI])")
+    print(f"{'='*60}")
     
-    # Save detailed results
+    width = max([15] + [len(agent) for agent, _ in stats])
+    for (agent, mode), pair_stats in stats.items():
+        summary = pair_stats.summary()
+        print(f"{agent:{width}} | {mode:8} | n={summary['trials']:<3} | "
+              f"Accuracy: {trial_stats.format_interval(summary['accuracy'])} | "
+              f"Time: {trial_stats.format_interval(summary['wall_time'], 1)}s | "
+              f"CPU: {trial_stats.format_interval(summary['cpu_seconds'], 1)}s | "
+              f"Peak RSS: {trial_stats.format_interval(summary['peak_rss_mb'], 1)}MB")
+
+def save_results(results, stats=None):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     results_file = f"test_results_{timestamp}.json"
     
@@ -249,6 +346,61 @@ def run_all_tests():
         json.dump(results, f, indent=2, default=str)
     
     print(f"\n📄 Detailed results saved to: {results_file}")
+    
+    if stats:
+        stats_file = f"test_stats_{timestamp}.json"
+        with open(stats_file, "w") as f:
+            json.dump([dict(agent=agent, mode=mode, **pair_stats.summary())
+                       for (agent, mode), pair_stats in stats.items()], f, indent=2, default=str)
+        print(f"📄 Trial statistics saved to: {stats_file}")
+    return results_file
+
+def run_all_tests(max_concurrency=len(AGENTS), trials=1, modes=("default",), ci_width=None, min_trials=3):
+    """Run tests for all available agents, up to max_concurrency at a time"""
+    print("COLOR DOMINANCE DETECTION - AGENT TESTING")
+    print("="*60)
+    
+    # Check agent availability
+    available_agents = check_agent_availability()
+    
+    if not any(available_agents.values()):
+        print("\n❌ No agents are available on this system.")
+        print("Please install at least one of the following:")
+        for agent_name in AGENTS.keys():
+            print(f"  - {agent_name}")
+        return
+    
+    for agent_name, is_available in available_agents.items():
+        if not is_available:
+            print(f"\n⏭️  Skipping {agent_name} (not available)")
+    
+    # Run tests
+    agent_names = [agent_name for agent_name, is_available in available_agents.items() if is_available]
+    print(f"\n🚀 Running {len(agent_names)} agents x {len(modes)} modes x {trials} trials, "
+          f"up to {max_concurrency} at a time")
+    start_time = time.time()
+    results, stats = asyncio.run(run_trials(agent_names, modes, trials, max_concurrency, ci_width, min_trials))
+    print(f"\n⏱️  {len(results)} runs finished in {time.time() - start_time:.1f}s")
+    
+    # Print summary
+    repeated = trials > 1 or len(modes) > 1
+    print_summary(results, repeated)
+    if repeated:
+        print_trial_summary(stats)
+    
+    # Save detailed results
+    save_results(results, stats if repeated else None)
 
 if __name__ == "__main__":
-    run_all_tests()
+    import argparse
+    parser = argparse.ArgumentParser(description="Run every available agent on the task")
+    parser.add_argument("--max-concurrency", type=int, default=len(AGENTS),
+                        help="agent runs allowed at the same time")
+    parser.add_argument("--trials", type=int, default=1, help="trials per (agent, mode) pair")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=["default"],
+                        help="prompting modes to test")
+    parser.add_argument("--ci-width", type=float, default=None,
+                        help="stop a pair once its 95%% accuracy CI half width is at most this")
+    parser.add_argument("--min-trials", type=int, default=3, help="trials before --ci-width can stop a pair")
+    args = parser.parse_args()
+    run_all_tests(max(1, args.max_concurrency), max(1, args.trials), args.modes, args.ci_width, args.min_trials)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import resource_meter
+
+MB = 1024 * 1024
+
+# Allocates 64 MB, forks a sleeping helper, writes 4 MB to disk and burns some CPU
+CHILD = """
+import os, subprocess, sys, time
+data = bytearray(64 * 1024 * 1024)
+helper = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.6)"])
+with open(sys.argv[1], "wb") as f:
+    f.write(b"x" * (4 * 1024 * 1024))
+    f.flush()
+    os.fsync(f.fileno())
+end = time.process_time() + 0.3
+while time.process_time() < end:
+    pass
+helper.wait()
+"""
+
+
+def run_metered(interval=0.05):
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(__file__))) as tmp:
+        process = subprocess.Popen([sys.executable, "-c", CHILD, os.path.join(tmp, "out.bin")])
+        meter = resource_meter.ProcessTreeMeter(process.pid, interval).start()
+        process.wait()
+        return meter, meter.stop()
+
+
+def test_meter_sees_process_tree():
+    meter, usage = run_metered()
+    assert not meter.overlapped
+    assert usage["samples"] >= 2
+    assert usage["processes"] >= 2  # the child and its helper
+    assert usage["peak_rss_bytes"] >= 64 * MB
+    assert usage["cpu_seconds"] >= 0.3
+    assert usage["disk_write_bytes"] >= 4 * MB
+
+
+def test_sampling_alone_sees_process_tree():
+    # An overlapping meter disables the RUSAGE_CHILDREN fallback
+    other = resource_meter.ProcessTreeMeter(os.getpid(), interval=10).start()
+    try:
+        meter, usage = run_metered()
+    finally:
+        other.stop()
+    assert meter.overlapped
+    assert usage["processes"] >= 2
+    assert usage["peak_rss_bytes"] >= 64 * MB
+    assert usage["cpu_seconds"] >= 0.15
+    assert usage["disk_write_bytes"] >= 4 * MB
+
+
+def test_overlapping_meters_skip_rusage_fallback():
+    first = resource_meter.ProcessTreeMeter(os.getpid(), interval=10).start()
+    second = resource_meter.ProcessTreeMeter(os.getpid(), interval=10).start()
+    assert first.overlapped and second.overlapped
+    first.stop()
+    second.stop()
+    assert not resource_meter.ProcessTreeMeter._active
+
+
+def test_read_stat_of_current_process():
+    ppid, cpu_seconds, rss_bytes = resource_meter.read_stat(os.getpid())
+    assert ppid == os.getppid() and cpu_seconds > 0 and rss_bytes > 0
+    assert os.getpid() in resource_meter.process_tree(os.getppid())
+    assert resource_meter.read_stat(2 ** 22 + 1) is None
+
+
+def test_describe():
+    usage = dict(resource_meter.EMPTY_USAGE, cpu_seconds=1.25, peak_rss_bytes=3 * MB, processes=2,
+                 disk_write_bytes=512)
+    assert resource_meter.describe(usage) == "CPU: 1.2s | RSS: 3.0MB | Procs: 2 | Written: 512B"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            print("Running {}...".format(name))
+            func()
+    print("\nResource meter tests completed successfully!")
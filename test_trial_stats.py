@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import trial_stats
+
+
+def test_t_critical_uses_nearest_smaller_df():
+    assert trial_stats.t_critical(1) == 12.706
+    assert trial_stats.t_critical(27) == trial_stats.T_CRITICAL_95[25]
+    assert trial_stats.t_critical(120) == 1.980
+    assert trial_stats.t_critical(500) == 1.960
+
+
+def test_summarize_known_sample():
+    stats = trial_stats.summarize([2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0])
+    assert stats["n"] == 8 and stats["mean"] == 5.0
+    assert math.isclose(stats["std"], math.sqrt(32 / 7))
+    half_width = 2.365 * math.sqrt(32 / 7) / math.sqrt(8)
+    assert math.isclose(stats["ci_half_width"], half_width)
+    assert math.isclose(stats["ci_low"], 5.0 - half_width) and math.isclose(stats["ci_high"], 5.0 + half_width)
+
+
+def test_summarize_small_samples():
+    assert trial_stats.summarize([])["mean"] is None
+    single = trial_stats.summarize([0.5])
+    assert single["mean"] == 0.5 and single["ci_half_width"] == math.inf
+    assert trial_stats.format_interval(single) == "0.500 ± 0.000"
+
+
+def test_converged_needs_min_trials_and_narrow_interval():
+    stats = trial_stats.TrialStats()
+    for accuracy in (0.8, 0.8):
+        stats.add({"evaluation": {"accuracy": accuracy}, "execution_time": 1.0})
+    assert not stats.converged(0.05, min_trials=3)
+    stats.add({"evaluation": {"accuracy": 0.8}, "execution_time": 1.0})
+    assert stats.converged(0.05, min_trials=3)
+    assert not stats.converged(None, min_trials=3)
+
+    stats.add({"evaluation": {"accuracy": 0.2}, "execution_time": 1.0})
+    assert not stats.converged(0.05, min_trials=3)
+    # 0.8, 0.8, 0.8, 0.2: std 0.3, half width 3.182 * 0.3 / 2
+    assert math.isclose(stats.summary()["accuracy"]["ci_half_width"], 3.182 * 0.3 / 2)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            print("Running {}...".format(name))
+            func()
+    print("\nTrial statistics tests completed successfully!")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+import errno
+import os
+import shutil
+import stat
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "colordominance_task-main"))
+
+import workspaces
+
+
+def make_inputs(root):
+    src_dir = os.path.join(root, "input")
+    os.makedirs(os.path.join(src_dir, "shard_00000"))
+    for name in ("targets.json", os.path.join("shard_00000", "image_1.png")):
+        with open(os.path.join(src_dir, name), "w") as f:
+            f.write("original " + name)
+        os.utime(os.path.join(src_dir, name), ns=(1_000_000_000, 1_000_000_000))
+    return src_dir
+
+
+def read(path):
+    with open(path, "r") as f:
+        return f.read()
+
+
+def patched(name, replacement):
+    """Swap ``workspaces.<name>`` (dotted, e.g. ``os.link``) for a test; returns a restore callable."""
+    owner_name, _, attr = name.rpartition(".")
+    owner = getattr(workspaces, owner_name) if owner_name else workspaces
+    original = getattr(owner, attr)
+    setattr(owner, attr, replacement)
+    return lambda: setattr(owner, attr, original)
+
+
+def cross_device_link(src, dst):
+    raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+
+def test_link_or_copy_falls_back_and_remembers_unsupported_reflink():
+    calls = []
+
+    def unsupported(src, dst):
+        calls.append(dst)
+        open(dst, "wb").close()
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    workspaces._NO_REFLINK.clear()
+    restore = patched("_reflink", unsupported)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "src.png")
+            with open(src, "w") as f:
+                f.write("pixels")
+            assert workspaces.link_or_copy(src, os.path.join(tmp, "a.png")) == "hardlink"
+            assert workspaces.link_or_copy(src, os.path.join(tmp, "b.png")) == "hardlink"
+            # The failed clone is tried once per filesystem pair
+            assert calls == [os.path.join(tmp, "a.png")]
+            assert os.path.samefile(src, os.path.join(tmp, "b.png"))
+
+            restore_link = patched("os.link", cross_device_link)
+            try:
+                assert workspaces.link_or_copy(src, os.path.join(tmp, "c.png")) == "copy"
+            finally:
+                restore_link()
+            assert read(os.path.join(tmp, "c.png")) == "pixels"
+            assert not os.path.samefile(src, os.path.join(tmp, "c.png"))
+    finally:
+        restore()
+        workspaces._NO_REFLINK.clear()
+
+
+def test_link_or_copy_prefers_reflink():
+    workspaces._NO_REFLINK.clear()
+    restore = patched("_reflink", shutil.copyfile)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "src.png")
+            with open(src, "w") as f:
+                f.write("pixels")
+            assert workspaces.link_or_copy(src, os.path.join(tmp, "a.png")) == "reflink"
+            assert read(os.path.join(tmp, "a.png")) == "pixels"
+    finally:
+        restore()
+
+
+def test_provisioned_inputs_are_read_only_links():
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = make_inputs(tmp)
+        workspace_dir = os.path.join(tmp, "workspace")
+        inputs_snapshot, methods = workspaces.provision_workspace(workspace_dir, shared_dirs=[(src_dir, "input")])
+        assert sum(methods.values()) == 2
+        assert sorted(inputs_snapshot) == sorted([os.path.join(src_dir, "targets.json"),
+                                                  os.path.join(src_dir, "shard_00000", "image_1.png")])
+        linked = os.path.join(workspace_dir, "input", "shard_00000", "image_1.png")
+        assert read(linked) == "original " + os.path.join("shard_00000", "image_1.png")
+        assert not os.stat(linked).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+        assert workspaces.changed_inputs(inputs_snapshot) == []
+
+        # Reprovisioning starts from a clean workspace
+        with open(os.path.join(workspace_dir, "solution.json"), "w") as f:
+            f.write("{}")
+        workspaces.provision_workspace(workspace_dir, shared_dirs=[(src_dir, "input")])
+        assert not os.path.exists(os.path.join(workspace_dir, "solution.json"))
+
+
+def test_modified_inputs_are_detected_and_restored():
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = make_inputs(tmp)
+        cache_dir = os.path.join(tmp, "cache")
+        store_dir = workspaces.refresh_pristine(src_dir, cache_dir)
+        workspace_dir = os.path.join(tmp, "workspace")
+        inputs_snapshot, methods = workspaces.provision_workspace(workspace_dir, shared_dirs=[(src_dir, "input")])
+
+        # An agent that chmods and rewrites a linked input in place, and deletes another
+        targets = os.path.join(src_dir, "targets.json")
+        image = os.path.join(src_dir, "shard_00000", "image_1.png")
+        linked = os.path.join(workspace_dir, "input", "targets.json")
+        os.chmod(linked, 0o644)
+        with open(linked, "w") as f:
+            f.write("tampered")
+        os.remove(image)
+        if methods.get("hardlink"):
+            assert read(targets) == "tampered"
+        else:
+            os.chmod(targets, 0o644)
+            with open(targets, "w") as f:
+                f.write("tampered")
+
+        changed = workspaces.changed_inputs(inputs_snapshot)
+        assert sorted(changed) == sorted([targets, image])
+        assert sorted(workspaces.restore_inputs(changed, src_dir, cache_dir)) == sorted(changed)
+        assert read(targets) == "original targets.json"
+        assert read(image) == "original " + os.path.join("shard_00000", "image_1.png")
+        assert os.stat(targets).st_mtime_ns == 1_000_000_000
+        assert workspaces.changed_inputs(inputs_snapshot) == []
+        # Restored files are new inodes; the workspace keeps its own copy
+        assert read(linked) == "tampered"
+        assert os.path.exists(os.path.join(store_dir, "targets.json"))
+
+
+def test_refresh_pristine_copies_only_changed_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = make_inputs(tmp)
+        cache_dir = os.path.join(tmp, "cache")
+        store_dir = workspaces.refresh_pristine(src_dir, cache_dir)
+        assert store_dir == workspaces.pristine_dir(src_dir, cache_dir)
+        inodes = {name: os.stat(os.path.join(store_dir, name)).st_ino
+                  for name in ("targets.json", os.path.join("shard_00000", "image_1.png"))}
+
+        with open(os.path.join(src_dir, "targets.json"), "w") as f:
+            f.write("regenerated")
+        workspaces.refresh_pristine(src_dir, cache_dir)
+        assert read(os.path.join(store_dir, "targets.json")) == "regenerated"
+        image = os.path.join("shard_00000", "image_1.png")
+        assert os.stat(os.path.join(store_dir, image)).st_ino == inodes[image]
+
+
+def test_describe():
+    assert workspaces.describe({"hardlink": 3, "copy": 1}) == "1 copy, 3 hardlink"
+    assert workspaces.describe({}) == "no files"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            print("Running {}...".format(name))
+            func()
+    print("\nWorkspace tests completed successfully!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Running statistics for repeated agent trials.
+
+``TrialStats`` collects accuracy, wall time, CPU time and peak RSS for one
+(agent, mode) pair and summarizes each as mean, sample standard deviation
+and a 95% Student-t confidence interval.  ``converged`` tells the scheduler
+when the accuracy interval is narrow enough to stop running more trials.
+"""
+
+import math
+
+# Two-sided 95% Student-t critical values by degrees of freedom
+T_CRITICAL_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+    9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131,
+    16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086, 25: 2.060, 30: 2.042,
+    40: 2.021, 60: 2.000, 120: 1.980,
+}
+
+
+def t_critical(df):
+    """95% critical value, rounding ``df`` down to the nearest tabulated value."""
+    if df > 120:
+        return 1.960
+    return T_CRITICAL_95[max(d for d in T_CRITICAL_95 if d <= df)]
+
+
+def summarize(values):
+    """``{"n", "mean", "std", "ci_low", "ci_high", "ci_half_width"}`` for a sample.
+
+    With fewer than two values the interval is unbounded (half width inf).
+    """
+    n = len(values)
+    if n == 0:
+        return {"n": 0, "mean": None, "std": None, "ci_low": None, "ci_high": None, "ci_half_width": None}
+    mean = sum(values) / n
+    if n == 1:
+        return {"n": 1, "mean": mean, "std": 0.0, "ci_low": -math.inf, "ci_high": math.inf,
+                "ci_half_width": math.inf}
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1))
+    half_width = t_critical(n - 1) * std / math.sqrt(n)
+    return {"n": n, "mean": mean, "std": std, "ci_low": mean - half_width, "ci_high": mean + half_width,
+            "ci_half_width": half_width}
+
+
+class TrialStats:
+    """Accuracy, wall time and resource usage of the finished trials of one (agent, mode) pair."""
+
+    def __init__(self):
+        self.accuracy = []
+        self.wall_time = []
+        self.cpu_seconds = []
+        self.peak_rss_mb = []
+
+    def add(self, result):
+        self.accuracy.append(result["evaluation"]["accuracy"])
+        self.wall_time.append(result["execution_time"])
+        resources = result.get("resources")
+        if resources:
+            self.cpu_seconds.append(resources["cpu_seconds"])
+            self.peak_rss_mb.append(resources["peak_rss_bytes"] / (1024 * 1024))
+
+    def __len__(self):
+        return len(self.accuracy)
+
+    def converged(self, ci_width, min_trials=3):
+        """True once at least ``min_trials`` ran and the accuracy CI half width is <= ``ci_width``."""
+        if ci_width is None or len(self) < min_trials:
+            return False
+        return summarize(self.accuracy)["ci_half_width"] <= ci_width
+
+    def summary(self):
+        return {
+            "trials": len(self),
+            "accuracy": summarize(self.accuracy),
+            "wall_time": summarize(self.wall_time),
+            "cpu_seconds": summarize(self.cpu_seconds),
+            "peak_rss_mb": summarize(self.peak_rss_mb),
+        }
+
+
+def format_interval(stats, precision=3):
+    """``mean ± std [low, high]`` for a ``summarize`` result."""
+    if not stats["n"]:
+        return "-"
+    text = f"{stats['mean']:.{precision}f} ± {stats['std']:.{precision}f}"
+    if math.isfinite(stats["ci_half_width"]):
+        text += f" [{stats['ci_low']:.{precision}f}, {stats['ci_high']:.{precision}f}]"
+    return text
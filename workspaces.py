@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Workspace provisioning for agent runs.
+
+Copying the full input/ directory into every workspace costs more than
+the agents' own startup on large image sets.  Read-only inputs are
+instead linked into the workspace, trying in order:
+
+1. reflink (copy-on-write clone, Linux FICLONE): shares blocks, and a
+   write in the workspace never reaches the source
+2. hardlink: shares the inode, so an in-place write would change the
+   source as well
+3. plain copy, e.g. across filesystems
+
+The first "not supported" reflink failure between two filesystems (e.g.
+on ext4) is remembered, so the rest of the tree does not pay for a
+failed clone per file.
+
+Linked inputs are made read-only; with hardlinks that includes the
+source, so dataset generators must replace files (write a temp file and
+``os.replace``) rather than rewrite them in place.  Read-only bits do not
+stop root or an agent that chmods, so provisioning also returns a
+snapshot of the shared source files: ``changed_inputs`` reports any that
+were modified and ``restore_inputs`` puts them back from a pristine copy
+kept by ``refresh_pristine``.  Deleting or replacing a workspace file
+only affects that workspace.
+
+Pristine copies live in ``pristine/`` under ``palette_lut.CACHE_DIR``.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import stat
+
+import palette_lut
+
+# ioctl request number of Linux FICLONE (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+# errno values meaning "this filesystem pair cannot reflink"
+REFLINK_UNSUPPORTED = {errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY}
+
+# (source device, destination device) pairs that cannot reflink
+_NO_REFLINK = set()
+
+
+def _reflink(src, dst):
+    import fcntl
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def link_or_copy(src, dst):
+    """Place ``src`` at ``dst`` as cheaply as possible; returns the method used."""
+    devices = (os.stat(src).st_dev, os.stat(os.path.dirname(dst) or ".").st_dev)
+    if devices not in _NO_REFLINK:
+        try:
+            _reflink(src, dst)
+            return "reflink"
+        except ImportError:
+            _NO_REFLINK.add(devices)
+        except OSError as e:
+            if e.errno in REFLINK_UNSUPPORTED:
+                _NO_REFLINK.add(devices)
+        if os.path.exists(dst):
+            os.remove(dst)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
+
+
+def snapshot(paths):
+    """``{path: (size, mtime_ns)}`` for files whose changes should be caught."""
+    result = {}
+    for path in paths:
+        st = os.stat(path)
+        result[path] = (st.st_size, st.st_mtime_ns)
+    return result
+
+
+def changed_inputs(inputs_snapshot):
+    """Shared input files that were modified or removed since ``snapshot``."""
+    changed = []
+    for path, before in inputs_snapshot.items():
+        try:
+            st = os.stat(path)
+        except OSError:
+            changed.append(path)
+            continue
+        if (st.st_size, st.st_mtime_ns) != before:
+            changed.append(path)
+    return changed
+
+
+def make_read_only(path):
+    mode = os.stat(path).st_mode
+    os.chmod(path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def link_tree(src_dir, dst_dir, methods=None):
+    """Recreate ``src_dir`` at ``dst_dir`` with every file linked read-only (see ``link_or_copy``).
+
+    Returns the list of source files; ``methods`` counts how each was placed.
+    """
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        target_dir = os.path.join(dst_dir, os.path.relpath(dirpath, src_dir))
+        os.makedirs(target_dir, exist_ok=True)
+        for filename in filenames:
+            src = os.path.join(dirpath, filename)
+            dst = os.path.join(target_dir, filename)
+            method = link_or_copy(src, dst)
+            make_read_only(dst)
+            if methods is not None:
+                methods[method] = methods.get(method, 0) + 1
+            sources.append(src)
+    return sources
+
+
+def pristine_dir(src_dir, cache_dir=None):
+    """Directory holding the pristine copy of ``src_dir``."""
+    key = hashlib.sha256(os.path.realpath(src_dir).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir or palette_lut.CACHE_DIR, "pristine", key)
+
+
+def _replace_with_copy(src, dst):
+    """Copy ``src`` (with its mtime) to a new file that replaces ``dst``."""
+    tmp_path = dst + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def refresh_pristine(src_dir, cache_dir=None):
+    """Bring the pristine copy of ``src_dir`` up to date; returns its path.
+
+    Only files whose size or mtime differ from the copy are copied, so
+    this is a stat per file once the copy exists.  Call it before runs
+    start, not while agents may be modifying ``src_dir``.
+    """
+    store_dir = pristine_dir(src_dir, cache_dir)
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        target_dir = os.path.join(store_dir, os.path.relpath(dirpath, src_dir))
+        os.makedirs(target_dir, exist_ok=True)
+        for filename in filenames:
+            src = os.path.join(dirpath, filename)
+            dst = os.path.join(target_dir, filename)
+            if not os.path.exists(dst) or snapshot([src]).get(src) != snapshot([dst]).get(dst):
+                _replace_with_copy(src, dst)
+    return store_dir
+
+
+def restore_inputs(paths, src_dir, cache_dir=None):
+    """Put files of ``src_dir`` back from its pristine copy; returns the paths restored.
+
+    Each file is replaced by a new inode, so workspaces still linked to
+    the modified one do not affect it.
+    """
+    store_dir = pristine_dir(src_dir, cache_dir)
+    restored = []
+    for path in paths:
+        pristine = os.path.join(store_dir, os.path.relpath(path, src_dir))
+        if os.path.exists(pristine):
+            _replace_with_copy(pristine, path)
+            restored.append(path)
+    return restored
+
+
+def provision_workspace(workspace_dir, shared_dirs=(), copied_files=()):
+    """Create a clean workspace.
+
+    ``shared_dirs`` are ``(src_dir, name)`` pairs linked in as read-only
+    inputs; ``copied_files`` are small files copied into the workspace
+    root.  Returns ``(inputs_snapshot, methods)``.
+    """
+    if os.path.exists(workspace_dir):
+        shutil.rmtree(workspace_dir)
+    os.makedirs(workspace_dir)
+
+    methods = {}
+    shared = []
+    for src_dir, name in shared_dirs:
+        shared.extend(link_tree(src_dir, os.path.join(workspace_dir, name), methods))
+    for path in copied_files:
+        shutil.copy(path, workspace_dir)
+    return snapshot(shared), methods
+
+
+def describe(methods):
+    return ", ".join("{} {}".format(count, method) for method, count in sorted(methods.items())) or "no files"